@@ -8,6 +8,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from state import AgentState, WorkflowStep, NodeName
 from llm_config import get_shared_llm
+from backend.core.units import quantity_in_metres
 from pricing_agent.tools import (
     load_test_pricing,
     recommend_tests,
@@ -97,7 +98,7 @@ def pricing_agent_node(state: AgentState) -> Dict[str, Any]:
         for product in recommended_products:
             if isinstance(product, dict):
                 sku = product.get("sku", "")
-                qty = product.get("quantity", 1000)
+                qty = quantity_in_metres(product.get("quantity"), default=1000)
                 if sku:
                     material_cost += calculate_material_cost(sku, qty)
         overhead, contingency, subtotal, grand_total = calculate_pricing_breakdown(material_cost, testing_cost)
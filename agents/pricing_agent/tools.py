@@ -3,6 +3,9 @@ from typing import List, Dict
 import os
 import json
 
+from backend.core.catalog_store import catalog_store
+from backend.core.units import quantity_in_metres
+
 
 def load_test_pricing():
     pricing_path = os.path.join(os.path.dirname(__file__), '../../data/test_pricing.json')
@@ -13,15 +16,11 @@ def load_test_pricing():
 
 
 def load_oem_catalog():
-    catalog_path = os.path.join(os.path.dirname(__file__), '../../data/catalog.json')
-    if os.path.exists(catalog_path):
-        with open(catalog_path, 'r') as f:
-            return json.load(f)
-    return []
+    """Current catalog products from the shared store used by all agents and the API"""
+    return catalog_store.products()
 
 
 TEST_PRICING = load_test_pricing()
-OEM_PRODUCT_CATALOG = load_oem_catalog()
 
 # Volume Discount Tiers
 VOLUME_DISCOUNTS = [
@@ -36,19 +35,18 @@ VOLUME_DISCOUNTS = [
 def get_product_price(sku: str, quantity: str) -> str:
     """
     Get the price for a product SKU with quantity-based discounts.
-    Input: sku - Product SKU, quantity - Quantity in meters (e.g., '5000')
+    Input: sku - Product SKU, quantity - Quantity in meters (e.g., '5000', '5 km', '2 drums of 500 m')
     """
-    product = next((p for p in OEM_PRODUCT_CATALOG if p["sku"] == sku), None)
+    product = catalog_store.normalized(sku)
     
     if not product:
         return f"Product with SKU '{sku}' not found."
     
-    try:
-        qty = int(quantity.replace(",", "").replace("m", "").strip())
-    except ValueError:
+    qty = quantity_in_metres(quantity)
+    if qty is None:
         return f"Invalid quantity: {quantity}"
     
-    base_price = product["base_price_per_meter"]
+    base_price = product.price_per_meter
     
     # Apply volume discount
     discount_percent = 0
@@ -60,8 +58,8 @@ def get_product_price(sku: str, quantity: str) -> str:
     discounted_price = base_price * (1 - discount_percent / 100)
     total_price = discounted_price * qty
     
-    result = f"## Pricing for {product['sku']}\n\n"
-    result += f"**Product:** {product['name']}\n"
+    result = f"## Pricing for {product.sku}\n\n"
+    result += f"**Product:** {product.record['name']}\n"
     result += f"**Quantity:** {qty:,} meters\n"
     result += f"**Base Price:** ₹{base_price}/m\n"
     result += f"**Volume Discount:** {discount_percent}%\n"
@@ -114,11 +112,11 @@ def calculate_total_quote(products_json: str, tests_json: str) -> str:
     total_material_cost = 0
     for item in products:
         sku = item.get("sku", "")
-        qty = item.get("quantity", 0)
+        qty = quantity_in_metres(item.get("quantity"), default=0)
         
-        product = next((p for p in OEM_PRODUCT_CATALOG if p["sku"] == sku), None)
+        product = catalog_store.normalized(sku)
         if product:
-            base_price = product["base_price_per_meter"]
+            base_price = product.price_per_meter
             
             # Apply volume discount
             discount_percent = 0
@@ -131,7 +129,7 @@ def calculate_total_quote(products_json: str, tests_json: str) -> str:
             total = unit_price * qty
             total_material_cost += total
             
-            result += f"| {sku} | {product['name'][:30]} | {qty:,} | ₹{base_price} | {discount_percent}% | ₹{total:,.0f} |\n"
+            result += f"| {sku} | {product.record['name'][:30]} | {qty:,} | ₹{base_price} | {discount_percent}% | ₹{total:,.0f} |\n"
     
     result += f"\n**Total Material Cost:** ₹{total_material_cost:,.0f}\n\n"
     
@@ -198,11 +196,11 @@ def recommend_tests(rfp_testing_requirements: List[str]) -> List[str]:
 
 def calculate_material_cost(product_sku: str, quantity: int) -> float:
     """Helper to calculate material cost for a product"""
-    product = next((p for p in OEM_PRODUCT_CATALOG if p["sku"] == product_sku), None)
+    product = catalog_store.normalized(product_sku)
     if not product:
         return 0
     
-    base_price = product["base_price_per_meter"]
+    base_price = product.price_per_meter
     
     # Apply volume discount
     discount_percent = 0
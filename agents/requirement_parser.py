@@ -0,0 +1,101 @@
+"""
+Requirement parser shared by the technical, pricing and prototype (resource/) tools.
+Turns a free-text RFP line item into a typed, hashable RequirementSpec.
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple, Union
+
+from backend.core.catalog_fields import normalize_standard
+from backend.core.units import parse_size_mm2, parse_voltage
+
+# Same line items repeat across tenders, so a few thousand entries cover the feed
+PARSE_CACHE_SIZE = 4096
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_CORES_RE = re.compile(r"(\d+(?:\.\d+)?)\s*c(?:ore)?")
+
+# Checked in reverse so the last listed insulation found in the text wins
+_INSULATION_TYPES = ("xlpe", "pvc", "fr-lsh", "rubber", "pe")
+
+_CONDUCTOR_PATTERNS = (
+    (("copper",), "copper"),
+    (("aluminium", "aluminum"), "aluminium"),
+)
+
+_ARMOUR_KEYWORDS = ("armour", "armored")
+
+_CABLE_TYPES = ("power", "control", "instrumentation", "flexible")
+
+_APPLICATIONS = ("underground", "overhead")
+
+
+@dataclass(frozen=True)
+class RequirementSpec:
+    """Structured specs extracted from an RFP requirement (None = not specified)"""
+    # Canonical grade label (e.g. '1.1 kV', '450/750 V') and its rated voltage in volts
+    voltage: Optional[str] = None
+    voltage_volts: Optional[int] = None
+    insulation: Optional[str] = None
+    cores: Optional[Union[int, float]] = None
+    size: Optional[float] = None
+    conductor: Optional[str] = None
+    armour: Optional[bool] = None
+    cable_type: Optional[str] = None
+    application: Optional[str] = None
+    # Canonical standard references the product must comply with (usually from the RFP's technical_specs)
+    standards: Tuple[str, ...] = ()
+
+
+def normalize_requirement(text: str) -> str:
+    """Lowercase and collapse whitespace so equivalent line items share a cache entry"""
+    return _WHITESPACE_RE.sub(" ", text.lower()).strip()
+
+
+def _first_match(text: str, patterns) -> Optional[str]:
+    for needles, value in patterns:
+        if any(needle in text for needle in needles):
+            return value
+    return None
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_normalized(req_lower: str) -> RequirementSpec:
+    insulation = next(
+        (ins.upper() for ins in reversed(_INSULATION_TYPES) if ins in req_lower), None
+    )
+
+    cores = None
+    core_match = _CORES_RE.search(req_lower)
+    if core_match:
+        cores_val = core_match.group(1)
+        cores = float(cores_val) if "." in cores_val else int(cores_val)
+
+    voltage = parse_voltage(req_lower)
+
+    return RequirementSpec(
+        voltage=voltage.label() if voltage else None,
+        voltage_volts=voltage.rated if voltage else None,
+        insulation=insulation,
+        cores=cores,
+        size=parse_size_mm2(req_lower),
+        conductor=_first_match(req_lower, _CONDUCTOR_PATTERNS),
+        armour=True if any(kw in req_lower for kw in _ARMOUR_KEYWORDS) else None,
+        cable_type=next((t for t in _CABLE_TYPES if t in req_lower), None),
+        application=next((a for a in _APPLICATIONS if a in req_lower), None),
+    )
+
+
+def parse_requirement(rfp_requirement: str) -> RequirementSpec:
+    """Parse a requirement line item (e.g. '1.1 kV XLPE Power Cable - 3C x 120 sqmm')"""
+    return _parse_normalized(normalize_requirement(rfp_requirement or ""))
+
+
+def required_standards(standards: Union[str, Iterable[str], None]) -> Tuple[str, ...]:
+    """Canonical, de-duplicated standards from an RFP list or a comma-separated string"""
+    if not standards:
+        return ()
+    if isinstance(standards, str):
+        standards = standards.split(",")
+    return tuple(sorted({normalize_standard(s) for s in standards} - {""}))
@@ -8,7 +8,8 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from state import AgentState, WorkflowStep, NodeName
-from sales_agent.tools import scan_rfp_websites, get_rfp_details, qualify_rfp_tool, prioritize_rfps_tool, SAMPLE_RFPS
+from sales_agent.tools import scan_rfp_websites, get_rfp_details, qualified_rfps, prioritize_rfps_tool
+from backend.core import rfp_store
 from llm_config import get_shared_llm
 
 SALES_AGENT_SYSTEM_PROMPT = """You are a Sales Agent specialized in RFP (Request for Proposal) analysis for electrical cable manufacturing.
@@ -52,17 +53,14 @@ def sales_agent_node(state: AgentState) -> Dict[str, Any]:
     try:
         print("🔍 Scanning RFPs...")
         scan_result = scan_rfp_websites.invoke({"urls": "all"})
-        print(f"Scan complete: {len(SAMPLE_RFPS)} RFPs in database")
+        print(f"Scan complete: {len(rfp_store.index())} RFPs in database")
 
         # Filter and qualify RFPs
-        qualified_rfps = []
-        for rfp in SAMPLE_RFPS:
-            if qualify_rfp_tool(rfp):
-                qualified_rfps.append(rfp)
+        qualified = qualified_rfps()
         
-        print(f"✅ Qualified: {len(qualified_rfps)} RFPs")
+        print(f"✅ Qualified: {len(qualified)} RFPs")
 
-        if not qualified_rfps:
+        if not qualified:
             return {
                 "messages": [AIMessage(content="No RFPs found matching our qualification criteria. Try adjusting requirements.")],
                 "next_node": NodeName.END,
@@ -70,15 +68,15 @@ def sales_agent_node(state: AgentState) -> Dict[str, Any]:
             }
 
         # Prioritize top 5
-        top_rfps = prioritize_rfps_tool(qualified_rfps)
+        top_rfps = prioritize_rfps_tool(qualified)
         print(f"📊 Prioritized top {len(top_rfps)} RFPs")
 
         # Format results using LLM
         rfp_summary = f"""
 ## RFP Scan Results
 
-**Scanned:** {len(SAMPLE_RFPS)} RFPs
-**Qualified:** {len(qualified_rfps)} RFPs  
+**Scanned:** {len(rfp_store.index())} RFPs
+**Qualified:** {len(qualified)} RFPs  
 **Top Opportunities:** {len(top_rfps)} RFPs
 
 ### Top {len(top_rfps)} Prioritized RFPs:
@@ -0,0 +1,84 @@
+"""
+On-disk cache of scanned portal pages.
+One JSON file per listing URL holds the page's ETag and Last-Modified
+validators, a SHA-256 of its body and the RFPs parsed from it, so a rescan
+can send a conditional request and skip parsing when the server answers 304
+or returns the same bytes again.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the parser or the entry layout changes, so pages cached by an older version are parsed again
+CACHE_FORMAT = 1
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    content_hash: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    rfps: List[Dict[str, Any]] = field(default_factory=list)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """URL -> CacheEntry, kept in `directory` and memoized after the first read"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._entries: Dict[str, Optional[CacheEntry]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            if url in self._entries:
+                return self._entries[url]
+        entry = None
+        path = self._path(url)
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    stored = json.load(f)
+                if stored.get("format") == CACHE_FORMAT and stored.get("url") == url:
+                    entry = CacheEntry(**stored["entry"])
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable page cache entry {path}: {e}")
+        with self._lock:
+            self._entries[url] = entry
+        return entry
+
+    def put(self, entry: CacheEntry) -> None:
+        """Store an entry; a read-only data directory only costs a full fetch and parse next time"""
+        with self._lock:
+            self._entries[entry.url] = entry
+        path = self._path(entry.url)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump({"format": CACHE_FORMAT, "url": entry.url, "entry": asdict(entry)}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not persist page cache entry for {entry.url}: {e}")
@@ -0,0 +1,282 @@
+"""
+Rule-based RFP prioritization.
+Each configured rule scores every candidate RFP at once over NumPy columns
+(value, days remaining, location, scope of supply). The engine sums the rule
+points, partitions out the top k and sorts only those; without NumPy the
+rules run per RFP and a heap selects the top k. Rule points come from
+DEFAULT_RULES, overridden per rule by the JSON file named in
+RFP_PRIORITY_RULES, which is re-read when it changes.
+"""
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import date
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+from backend.core.rfp_records import RFPRecord
+from backend.core.topk import top_k
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.warning("NumPy not available, falling back to per-RFP priority scoring")
+
+logger = logging.getLogger(__name__)
+
+# JSON file of rule overrides, e.g. {"location": {"points": 15, "preferred": ["Delhi"]}}
+PRIORITY_RULES_FILE = os.getenv("RFP_PRIORITY_RULES", "")
+
+# A rule with 0 points is skipped. The defaults add up to 100.
+DEFAULT_RULES: Dict[str, Dict[str, Any]] = {
+    # [minimum value in INR, points]: the highest band reached wins; RFPs without a value score 0
+    "value_bands": {"bands": [[50000000, 50], [10000000, 40], [5000000, 30], [0, 20]]},
+    # [min days, max days, points]: the first window containing the days remaining wins, else
+    # `points`; RFPs without a deadline score 0
+    "urgency": {"windows": [[30, 60, 50], [15, 29, 40], [61, 90, 35]], "points": 20},
+    # `points` for an RFP whose location names any preferred region (case-insensitive)
+    "location": {"preferred": [], "points": 0},
+    # `points` scaled by the share of scope-of-supply lines naming any keyword
+    "capability": {"keywords": ["xlpe", "pvc", "power cable", "control cable", "armoured"], "points": 0},
+}
+
+
+class RFPFrame:
+    """Columns of a list of RFPs as of `today`; missing values and deadlines are NaN"""
+
+    def __init__(self, records: Sequence[RFPRecord], today: date):
+        self.records = records
+        self.today = today
+        nan = float("nan")
+        self.value = np.fromiter(
+            (nan if r.value_inr is None else r.value_inr for r in records), dtype=np.float64, count=len(records),
+        )
+        today_ordinal = today.toordinal()
+        self.days = np.fromiter(
+            (r.deadline.toordinal() - today_ordinal if r.deadline else nan for r in records),
+            dtype=np.float64, count=len(records),
+        )
+
+
+class PriorityRule(ABC):
+    """Scores RFPs with points from its config; `score` is the vectorized form of `score_record`"""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.points = float(config.get("points", 0))
+
+    @property
+    def enabled(self) -> bool:
+        return self.points != 0
+
+    @abstractmethod
+    def score(self, frame: RFPFrame) -> "np.ndarray":
+        """Points for every RFP in the frame"""
+
+    @abstractmethod
+    def score_record(self, record: RFPRecord, today: date) -> float:
+        """Points for one RFP (used without NumPy)"""
+
+
+# Rule name (the key in DEFAULT_RULES and the rules file) -> class
+RULES: Dict[str, Type[PriorityRule]] = {}
+
+
+def register_rule(name: str) -> Callable[[Type[PriorityRule]], Type[PriorityRule]]:
+    def register(cls: Type[PriorityRule]) -> Type[PriorityRule]:
+        RULES[name] = cls
+        return cls
+    return register
+
+
+@register_rule("value_bands")
+class ValueBandsRule(PriorityRule):
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        bands = sorted((float(minimum), float(points)) for minimum, points in config["bands"])
+        self.minimums = [minimum for minimum, _ in bands]
+        self.band_points = [points for _, points in bands]
+
+    @property
+    def enabled(self) -> bool:
+        return any(self.band_points)
+
+    def score(self, frame: RFPFrame) -> "np.ndarray":
+        band = np.searchsorted(self.minimums, frame.value, side="right") - 1
+        # Values below the lowest band or missing (NaN sorts last) score 0
+        valid = (band >= 0) & ~np.isnan(frame.value)
+        return np.where(valid, np.asarray(self.band_points)[band.clip(0)], 0.0)
+
+    def score_record(self, record: RFPRecord, today: date) -> float:
+        if record.value_inr is None:
+            return 0.0
+        for minimum, points in zip(reversed(self.minimums), reversed(self.band_points)):
+            if record.value_inr >= minimum:
+                return points
+        return 0.0
+
+
+@register_rule("urgency")
+class UrgencyRule(PriorityRule):
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.windows = [(float(low), float(high), float(points)) for low, high, points in config["windows"]]
+
+    @property
+    def enabled(self) -> bool:
+        return self.points != 0 or any(points for _, _, points in self.windows)
+
+    def score(self, frame: RFPFrame) -> "np.ndarray":
+        scores = np.where(np.isnan(frame.days), 0.0, self.points)
+        # Applied last to first, so the first matching window has the final say
+        for low, high, points in reversed(self.windows):
+            scores = np.where((frame.days >= low) & (frame.days <= high), points, scores)
+        return scores
+
+    def score_record(self, record: RFPRecord, today: date) -> float:
+        days = record.days_remaining(today)
+        if days is None:
+            return 0.0
+        for low, high, points in self.windows:
+            if low <= days <= high:
+                return points
+        return self.points
+
+
+@register_rule("location")
+class LocationRule(PriorityRule):
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.preferred = tuple(region.lower() for region in config.get("preferred", []))
+
+    @property
+    def enabled(self) -> bool:
+        return self.points != 0 and bool(self.preferred)
+
+    def _preferred(self, location: str) -> bool:
+        location = location.lower()
+        return any(region in location for region in self.preferred)
+
+    def score(self, frame: RFPFrame) -> "np.ndarray":
+        # Tender pools repeat a handful of locations: test each distinct one once
+        matches: Dict[str, bool] = {}
+        for record in frame.records:
+            if record.location not in matches:
+                matches[record.location] = self._preferred(record.location)
+        hit = np.fromiter((matches[r.location] for r in frame.records), dtype=bool, count=len(frame.records))
+        return hit * self.points
+
+    def score_record(self, record: RFPRecord, today: date) -> float:
+        return self.points if self._preferred(record.location) else 0.0
+
+
+@register_rule("capability")
+class CapabilityRule(PriorityRule):
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        keywords = tuple(keyword.lower() for keyword in config.get("keywords", []))
+
+        @lru_cache(maxsize=4096)
+        def covered(item: str) -> bool:
+            item = item.lower()
+            return any(keyword in item for keyword in keywords)
+
+        self.covered = covered
+
+    def _fit(self, record: RFPRecord) -> float:
+        if not record.scope:
+            return 0.0
+        return sum(self.covered(line.item) for line in record.scope) / len(record.scope)
+
+    def score(self, frame: RFPFrame) -> "np.ndarray":
+        fit = np.fromiter(map(self._fit, frame.records), dtype=np.float64, count=len(frame.records))
+        return fit * self.points
+
+    def score_record(self, record: RFPRecord, today: date) -> float:
+        return self._fit(record) * self.points
+
+
+def load_rules(path: str = "") -> Dict[str, Dict[str, Any]]:
+    """DEFAULT_RULES with each rule's settings overridden by the JSON file at `path` (if given)"""
+    rules = {name: dict(config) for name, config in DEFAULT_RULES.items()}
+    if not path:
+        return rules
+    with open(path, "r") as f:
+        overrides = json.load(f)
+    for name, config in overrides.items():
+        if name not in RULES:
+            raise ValueError(f"Unknown priority rule '{name}' (expected one of: {', '.join(RULES)})")
+        rules.setdefault(name, {}).update(config)
+    return rules
+
+
+class PriorityEngine:
+    """Sums the enabled rules over all candidate RFPs; ties go to the earlier deadline, then RFP id"""
+
+    def __init__(self, rules: Optional[Dict[str, Dict[str, Any]]] = None):
+        rules = DEFAULT_RULES if rules is None else rules
+        self.rules = [rule for rule in (RULES[name](config) for name, config in rules.items()) if rule.enabled]
+
+    def _score_frame(self, frame: RFPFrame) -> "np.ndarray":
+        total = np.zeros(len(frame.records))
+        for rule in self.rules:
+            total += rule.score(frame)
+        return total
+
+    def scores(self, records: Sequence[RFPRecord], today: date) -> Sequence[float]:
+        if not NUMPY_AVAILABLE:
+            return [sum(rule.score_record(record, today) for rule in self.rules) for record in records]
+        return self._score_frame(RFPFrame(records, today))
+
+    def top(self, records: Sequence[RFPRecord], k: int, today: date) -> List[Tuple[float, RFPRecord]]:
+        """The k best RFPs as (score, record), best first"""
+        if k <= 0:
+            return []
+        if not NUMPY_AVAILABLE:
+            scores = self.scores(records, today)
+            best = top_k(
+                range(len(records)), k,
+                score=lambda i: scores[i],
+                tie_break=lambda i: (records[i].deadline or date.max, records[i].id),
+            )
+            return [(scores[i], records[i]) for i in best]
+
+        frame = RFPFrame(records, today)
+        scores = self._score_frame(frame)
+        candidates = np.arange(len(records))
+        if k < len(records):
+            # Only RFPs scoring at least the k-th best score can make the cut
+            kth = np.partition(scores, len(records) - k)[len(records) - k]
+            candidates = np.flatnonzero(scores >= kth)
+        # Same order as the heap path: score desc, then deadline (undated = NaN sorts last), then id
+        ids = np.array([records[i].id for i in candidates.tolist()], dtype=str)
+        order = np.lexsort((ids, frame.days[candidates], -scores[candidates]))
+        return [(float(scores[i]), records[i]) for i in candidates[order[:k]].tolist()]
+
+
+_engine: Optional[PriorityEngine] = None
+_engine_mtime: Optional[float] = None
+
+
+def get_priority_engine() -> PriorityEngine:
+    """Engine for the configured rules, rebuilt when the RFP_PRIORITY_RULES file changes"""
+    global _engine, _engine_mtime
+    mtime = None
+    if PRIORITY_RULES_FILE:
+        try:
+            mtime = os.path.getmtime(PRIORITY_RULES_FILE)
+        except OSError:
+            pass
+    if _engine is None or mtime != _engine_mtime:
+        if PRIORITY_RULES_FILE and mtime is None:
+            logger.warning(f"Priority rules file {PRIORITY_RULES_FILE} not found, using the default rules")
+        try:
+            _engine = PriorityEngine(load_rules(PRIORITY_RULES_FILE if mtime is not None else ""))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            # Keep ranking with the last good rules (or the defaults) until the file is fixed
+            logger.warning(f"Invalid priority rules in {PRIORITY_RULES_FILE}: {e}")
+            _engine = _engine or PriorityEngine()
+        _engine_mtime = mtime
+    return _engine
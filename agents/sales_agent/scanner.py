@@ -0,0 +1,292 @@
+"""
+Concurrent tender-portal scanner.
+Listing pages are fetched by a bounded thread pool over one requests.Session,
+whose pooled keep-alive connections are reused across scans, with at most
+SCAN_PER_HOST requests in flight per host. Each host has its own queue and a
+page is only handed to the pool while its host has a free slot, so a busy host
+never ties up pool threads the other hosts could use. Pages are parsed into RFP dicts
+(listing tables in HTML, or JSON feeds) as they arrive; BeautifulSoup is
+CPU-bound, so SCAN_PARSE_WORKERS moves parsing into a process pool. With the
+page cache, unchanged pages (304, or the same body hash) are not parsed again.
+"""
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from backend.core.rfp_records import parse_deadline
+from sales_agent.page_cache import CacheEntry, PageCache, content_hash
+
+logger = logging.getLogger(__name__)
+
+# Listing pages scanned for "all", comma-separated
+SCAN_URLS = [url.strip() for url in os.getenv("RFP_MONITORING_URLS", "").split(",") if url.strip()]
+# Pages fetched at once across all hosts, and per host
+SCAN_MAX_WORKERS = int(os.getenv("SCAN_MAX_WORKERS", "16"))
+SCAN_PER_HOST = int(os.getenv("SCAN_PER_HOST", "4"))
+# Seconds to connect, and between bytes of the response
+SCAN_TIMEOUT = float(os.getenv("SCAN_TIMEOUT", "10"))
+# 0 parses pages on the fetch threads; set to the number of worker processes to enable
+SCAN_PARSE_WORKERS = int(os.getenv("SCAN_PARSE_WORKERS", "0"))
+# Conditional-request cache of listing pages in data/scan_cache (0 = always fetch and parse in full)
+SCAN_CACHE = os.getenv("SCAN_CACHE", "1") == "1"
+SCAN_CACHE_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "../../data/scan_cache"))
+
+USER_AGENT = "rfp-automation-scanner/1.0"
+
+# Listing-table header keywords -> RFP field; checked in order, so "Submission Date" is a
+# deadline and "Tender Value" a value before "tender" can claim them as an id
+HEADER_FIELDS = (
+    ("submission_deadline", ("deadline", "closing", "due date", "submission", "last date", "bid end", "end date")),
+    ("estimated_value", ("value", "estimated cost", "tender cost", "amount")),
+    ("id", ("tender id", "tender no", "rfp id", "rfp no", "reference", "ref no", "id")),
+    ("title", ("title", "description", "name of work", "work", "item")),
+    ("client", ("client", "organisation", "organization", "department", "buyer", "authority")),
+    ("location", ("location", "state", "city", "place")),
+)
+_HEADER_PATTERNS = tuple(
+    (name, re.compile(r"\b(?:" + "|".join(re.escape(keyword) for keyword in keywords) + r")\b"))
+    for name, keywords in HEADER_FIELDS
+)
+
+
+def _column_fields(headers: List[str]) -> List[Optional[str]]:
+    """RFP field for each listing column (None for unrecognised or repeated fields)"""
+    fields: List[Optional[str]] = []
+    for header in headers:
+        text = re.sub(r"[^a-z0-9]+", " ", header.lower())
+        name = next((name for name, pattern in _HEADER_PATTERNS if pattern.search(text)), None)
+        fields.append(name if name not in fields else None)
+    return fields
+
+
+def _normalize(rfp: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+    """Portal deadlines as ISO dates, plus the listing page the RFP came from"""
+    deadline = parse_deadline(rfp.get("submission_deadline"))
+    if deadline:
+        rfp["submission_deadline"] = deadline.isoformat()
+    rfp.setdefault("url", base_url)
+    rfp["source"] = base_url
+    return rfp
+
+
+def parse_listing(content: bytes, base_url: str, content_type: str = "") -> List[Dict[str, Any]]:
+    """RFP dicts from a listing page: a JSON list (or {"rfps": [...]}) of RFPs, or HTML tables
+    whose header row names at least an id and a title column. Rows link to their notice."""
+    if "json" in content_type or content.lstrip()[:1] in (b"[", b"{"):
+        data = json.loads(content)
+        items = data if isinstance(data, list) else data.get("rfps") or data.get("tenders") or []
+        return [_normalize(dict(item), base_url) for item in items if isinstance(item, dict) and item.get("id")]
+
+    rfps = []
+    soup = BeautifulSoup(content, "html.parser")
+    for table in soup.find_all("table"):
+        rows = table.find_all("tr")
+        if not rows:
+            continue
+        fields = _column_fields([cell.get_text(" ", strip=True) for cell in rows[0].find_all(["th", "td"])])
+        if "id" not in fields or "title" not in fields:
+            continue
+        for row in rows[1:]:
+            cells = row.find_all(["td", "th"])
+            rfp = {
+                name: cell.get_text(" ", strip=True)
+                for name, cell in zip(fields, cells) if name
+            }
+            if not rfp.get("id") or not rfp.get("title"):
+                continue
+            link = row.find("a", href=True)
+            if link:
+                rfp["url"] = urljoin(base_url, link["href"])
+            rfps.append(_normalize(rfp, base_url))
+    return rfps
+
+
+@dataclass
+class PageResult:
+    """Outcome of scanning one listing page; RFPs already handed out unchanged are not repeated"""
+    url: str
+    rfps: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    unchanged: bool = False
+
+
+@dataclass
+class ScanReport:
+    pages: List[PageResult]
+
+    @property
+    def rfps(self) -> List[Dict[str, Any]]:
+        return [rfp for page in self.pages for rfp in page.rfps]
+
+    @property
+    def errors(self) -> Dict[str, str]:
+        return {page.url: page.error for page in self.pages if page.error}
+
+    @property
+    def unchanged(self) -> int:
+        return sum(page.unchanged for page in self.pages)
+
+
+@dataclass
+class FetchedPage:
+    """A fetched listing; `content` is None when the cached parse still holds (entry.rfps)"""
+    entry: CacheEntry
+    content: Optional[bytes] = None
+    final_url: str = ""
+    content_type: str = ""
+
+
+class PortalScanner:
+    """Fetches and parses listing pages concurrently; reuse one instance so connections stay warm"""
+
+    def __init__(self, max_workers: int = SCAN_MAX_WORKERS, per_host: int = SCAN_PER_HOST,
+                 timeout: float = SCAN_TIMEOUT, parse_workers: int = SCAN_PARSE_WORKERS,
+                 cache: Optional[PageCache] = None):
+        self.timeout = timeout
+        self.per_host = per_host
+        self.cache = cache
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = USER_AGENT
+        # One kept-alive connection per in-flight request to a host; brief retries for refused
+        # connections and flaky gateways, but a read timeout fails the page instead of stalling the scan
+        adapter = HTTPAdapter(
+            pool_connections=max_workers,
+            pool_maxsize=per_host,
+            max_retries=Retry(total=2, read=0, backoff_factor=0.3, status_forcelist=(502, 503, 504), allowed_methods=("GET",)),
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._fetch_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="portal-scan")
+        self._parse_pool: Executor = (
+            ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 0 else self._fetch_pool
+        )
+        # Host -> fetches waiting for a slot, and fetches in flight (shared by concurrent scans)
+        self._host_queues: Dict[str, Deque[Tuple[str, Future]]] = {}
+        self._host_active: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        # URL -> content hash whose RFPs this process has already returned
+        self._delivered: Dict[str, str] = {}
+
+    def _schedule(self, url: str) -> Future:
+        """Future of fetch(url), started once its host has fewer than per_host fetches in flight"""
+        future: Future = Future()
+        host = urlsplit(url).netloc
+        with self._lock:
+            self._host_queues.setdefault(host, deque()).append((url, future))
+        self._start_next(host)
+        return future
+
+    def _start_next(self, host: str) -> None:
+        with self._lock:
+            queue = self._host_queues.get(host)
+            ready = []
+            while queue and self._host_active.get(host, 0) < self.per_host:
+                ready.append(queue.popleft())
+                self._host_active[host] = self._host_active.get(host, 0) + 1
+            if not queue:
+                self._host_queues.pop(host, None)
+                if not self._host_active.get(host):
+                    self._host_active.pop(host, None)
+        for url, future in ready:
+            self._fetch_pool.submit(self._run_fetch, host, url, future)
+
+    def _run_fetch(self, host: str, url: str, future: Future) -> None:
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(self.fetch(url))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                self._host_active[host] -= 1
+            self._start_next(host)
+
+    def fetch(self, url: str) -> FetchedPage:
+        """Conditional GET against the cached validators; raises requests.RequestException on failure"""
+        cached = self.cache.get(url) if self.cache else None
+        headers = cached.conditional_headers() if cached else {}
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached:
+            return FetchedPage(cached)
+        response.raise_for_status()
+
+        entry = CacheEntry(
+            url=url,
+            content_hash=content_hash(response.content),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        if cached and cached.content_hash == entry.content_hash:
+            # Same bytes without a 304 (no or changed validators): keep the parse, refresh the validators
+            entry.rfps = cached.rfps
+            if (entry.etag, entry.last_modified) != (cached.etag, cached.last_modified):
+                self.cache.put(entry)
+            return FetchedPage(entry)
+        return FetchedPage(entry, response.content, response.url, response.headers.get("Content-Type", ""))
+
+    def scan(self, urls: Iterable[str]) -> ScanReport:
+        """Fetch every page at once (within the limits) and parse each changed page as soon as it arrives"""
+        pages = {url: PageResult(url) for url in urls}
+        fetches = {self._schedule(url): url for url in pages}
+        parses = {}
+        for future in as_completed(fetches):
+            url = fetches[future]
+            try:
+                fetched = future.result()
+            except requests.RequestException as e:
+                pages[url].error = f"{type(e).__name__}: {e}"
+                logger.warning(f"Could not fetch {url}: {e}")
+                continue
+            if fetched.content is None:
+                pages[url].unchanged = True
+                # Cached RFPs are only returned if this process has not returned them already
+                if self._delivered.get(url) != fetched.entry.content_hash:
+                    pages[url].rfps = fetched.entry.rfps
+                    self._delivered[url] = fetched.entry.content_hash
+                continue
+            future = self._parse_pool.submit(parse_listing, fetched.content, fetched.final_url, fetched.content_type)
+            parses[future] = fetched.entry
+
+        for future in as_completed(parses):
+            entry = parses[future]
+            try:
+                entry.rfps = future.result()
+            except Exception as e:
+                pages[entry.url].error = f"Unparseable listing: {e}"
+                logger.warning(f"Could not parse {entry.url}: {e}")
+                continue
+            pages[entry.url].rfps = entry.rfps
+            self._delivered[entry.url] = entry.content_hash
+            if self.cache:
+                self.cache.put(entry)
+        return ScanReport(list(pages.values()))
+
+    def close(self) -> None:
+        self._fetch_pool.shutdown(wait=True, cancel_futures=True)
+        if self._parse_pool is not self._fetch_pool:
+            self._parse_pool.shutdown(wait=True, cancel_futures=True)
+        self.session.close()
+
+
+_scanner: Optional[PortalScanner] = None
+
+
+def get_portal_scanner() -> PortalScanner:
+    """Shared scanner, created on first use"""
+    global _scanner
+    if _scanner is None:
+        _scanner = PortalScanner(cache=PageCache(SCAN_CACHE_DIR) if SCAN_CACHE else None)
+    return _scanner
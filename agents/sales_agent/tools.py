@@ -1,49 +1,86 @@
 from langchain.tools import tool
-from typing import List, Dict
-from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Union
+from datetime import date, timedelta
 import os
 import json
 
-# Load sample RFPs from data folder
-def load_sample_rfps():
-    data_path = os.path.join(os.path.dirname(__file__), '../../data/rfps.json')
-    if os.path.exists(data_path):
-        with open(data_path, 'r') as f:
-            return json.load(f)
-    return []
+from backend.core import rfp_store
+from backend.core.rfp_index import DeadlineIndex
+from backend.core.rfp_records import RFPRecord, parse_rfp
+from backend.core.units import parse_inr
+from sales_agent.prioritization import get_priority_engine
+from sales_agent.scanner import SCAN_URLS, get_portal_scanner
 
-SAMPLE_RFPS = load_sample_rfps()
+# Every tool below reads parsed records from the RFP store's shared deadline index
+# (read from data/rfps.json on first use and kept in step with the API) instead of raw strings
+
+# Scan window and the minimum bid-preparation time, in days
+SCAN_WINDOW_DAYS = 90
+MIN_DAYS_TO_BID = 7
+
+# Fields the tools display, for scraped listings that omit them (stored through rfp_store.upsert)
+LISTING_DEFAULTS = {"client": "", "submission_deadline": "TBD", "estimated_value": "TBD"}
+
+
+def get_rfp(rfp_id: str) -> Optional[dict]:
+    """Helper to fetch a raw RFP by ID"""
+    return rfp_store.get(rfp_id)
+
+
+def as_record(rfp: Union[RFPRecord, dict]) -> RFPRecord:
+    """Helper so the qualification/prioritization helpers accept parsed records or raw RFP dicts"""
+    return rfp if isinstance(rfp, RFPRecord) else parse_rfp(rfp)
 
 
 @tool("scan_rfp_websites")
-def scan_rfp_websites(urls: str = "all") -> str:
+def scan_rfp_websites(urls: str = "all", due_within: int = SCAN_WINDOW_DAYS) -> str:
     """
     Scan predefined URLs/websites to identify RFPs.
     Returns a list of RFPs found with basic details.
-    Input: 'all' to scan all sources, or comma-separated URLs.
+    Input: 'all' to scan all sources, or comma-separated URLs;
+    due_within: only list RFPs due in the next N days (default 90).
     """
-    today = datetime.now()
-    three_months_later = today + timedelta(days=90)
+    sources = SCAN_URLS if urls.strip().lower() == "all" else [url.strip() for url in urls.split(",") if url.strip()]
+    scan_note = ""
+    if sources:
+        report = get_portal_scanner().scan(sources)
+        added, updated = rfp_store.upsert(report.rfps, defaults=LISTING_DEFAULTS)
+        scan_note = (
+            f"Scanned {len(report.pages)} portal pages ({report.unchanged} unchanged): "
+            f"{added} new, {updated} updated RFPs.\n"
+        )
+        for url, error in report.errors.items():
+            scan_note += f"  Failed: {url} ({error})\n"
+        # Qualification needs a value; say which listings did not carry one instead of dropping them quietly
+        unvalued = [
+            rfp_id for rfp_id in dict.fromkeys(rfp["id"] for rfp in report.rfps)
+            if parse_inr(rfp_store.get(rfp_id).get("estimated_value")) is None
+        ]
+        if unvalued:
+            scan_note += f"  No estimated value listed, so not qualified: {', '.join(unvalued)}\n"
+        scan_note += "\n"
+
+    today = date.today()
     
     upcoming_rfps = []
-    for rfp in SAMPLE_RFPS:
-        deadline = datetime.strptime(rfp["submission_deadline"], "%Y-%m-%d")
-        if today <= deadline <= three_months_later:
-            upcoming_rfps.append({
-                "id": rfp["id"],
-                "title": rfp["title"],
-                "client": rfp["client"],
-                "submission_deadline": rfp["submission_deadline"],
-                "estimated_value": rfp["estimated_value"],
-                "url": rfp.get("url", "N/A"),
-                "days_remaining": (deadline - today).days,
-            })
+    for record in rfp_store.index().due_within(due_within, today):
+        rfp = record.raw
+        upcoming_rfps.append({
+            "id": record.id,
+            "title": record.title,
+            "client": record.client,
+            "submission_deadline": record.deadline.isoformat(),
+            "estimated_value": rfp.get("estimated_value", "N/A"),
+            "url": rfp.get("url", "N/A"),
+            "days_remaining": record.days_remaining(today),
+        })
     
     if not upcoming_rfps:
-        return "No RFPs found due in the next 3 months."
+        return scan_note + f"No RFPs found due in the next {due_within} days."
     
-    result = f"Found {len(upcoming_rfps)} RFPs due in the next 3 months:\n\n"
-    for rfp in sorted(upcoming_rfps, key=lambda x: x["days_remaining"]):
+    # Already in deadline order
+    result = scan_note + f"Found {len(upcoming_rfps)} RFPs due in the next {due_within} days:\n\n"
+    for rfp in upcoming_rfps:
         result += f"- **{rfp['id']}**: {rfp['title']}\n"
         result += f"  Client: {rfp['client']}\n"
         result += f"  Deadline: {rfp['submission_deadline']} ({rfp['days_remaining']} days remaining)\n"
@@ -59,7 +96,7 @@ def get_rfp_details(rfp_id: str) -> str:
     technical specifications, and testing requirements.
     Input: RFP ID (e.g., 'TOT-2026-001')
     """
-    rfp = next((r for r in SAMPLE_RFPS if r["id"] == rfp_id), None)
+    rfp = get_rfp(rfp_id)
     
     if not rfp:
         return f"RFP with ID '{rfp_id}' not found."
@@ -98,7 +135,7 @@ def extract_rfp_summary_for_technical(rfp_id: str) -> str:
     Focuses on scope of supply and technical specifications.
     Input: RFP ID (e.g., 'TOT-2026-001')
     """
-    rfp = next((r for r in SAMPLE_RFPS if r["id"] == rfp_id), None)
+    rfp = get_rfp(rfp_id)
     
     if not rfp:
         return f"RFP with ID '{rfp_id}' not found."
@@ -132,7 +169,7 @@ def extract_rfp_summary_for_pricing(rfp_id: str) -> str:
     Focuses on testing and acceptance test requirements.
     Input: RFP ID (e.g., 'TOT-2026-001')
     """
-    rfp = next((r for r in SAMPLE_RFPS if r["id"] == rfp_id), None)
+    rfp = get_rfp(rfp_id)
     
     if not rfp:
         return f"RFP with ID '{rfp_id}' not found."
@@ -173,81 +210,34 @@ def extract_rfp_summary_for_pricing(rfp_id: str) -> str:
     return result
 
 
-def qualify_rfp_tool(rfp_data: dict) -> bool:
+def qualify_rfp_tool(rfp_data: Union[RFPRecord, dict]) -> bool:
     """Helper function to qualify RFPs based on business criteria"""
-    try:
-        # Basic qualification criteria
-        if not rfp_data.get("estimated_value"):
-            return False
-        
-        # Check deadline is reasonable (at least 7 days away)
-        deadline_str = rfp_data.get("submission_deadline", "")
-        if deadline_str:
-            deadline = datetime.strptime(deadline_str, "%Y-%m-%d")
-            days_remaining = (deadline - datetime.now()).days
-            if days_remaining < 7:
-                return False
-        
-        return True
-    except Exception:
-        return False
-
-
-def prioritize_rfps_tool(rfps: List[dict]) -> List[dict]:
-    """Helper function to prioritize RFPs based on scoring criteria"""
-    scored_rfps = []
+    record = as_record(rfp_data)
     
-    for rfp in rfps:
-        score = 0
-        
-        # Score based on value (simplified)
-        value_str = rfp.get("estimated_value", "₹0")
-        try:
-            # Extract numeric value
-            import re
-            value_match = re.search(r'(\d+(?:\.\d+)?)', value_str)
-            if value_match:
-                value = float(value_match.group(1))
-                if "Cr" in value_str:
-                    value *= 10000000
-                elif "L" in value_str or "Lakh" in value_str:
-                    value *= 100000
-                
-                # Higher value = higher score (max 50 points)
-                if value >= 50000000:
-                    score += 50
-                elif value >= 10000000:
-                    score += 40
-                elif value >= 5000000:
-                    score += 30
-                else:
-                    score += 20
-        except:
-            pass
-        
-        # Score based on deadline urgency (max 50 points)
-        deadline_str = rfp.get("submission_deadline", "")
-        if deadline_str:
-            try:
-                deadline = datetime.strptime(deadline_str, "%Y-%m-%d")
-                days_remaining = (deadline - datetime.now()).days
-                if 30 <= days_remaining <= 60:
-                    score += 50  # Optimal window
-                elif 15 <= days_remaining < 30:
-                    score += 40
-                elif 60 < days_remaining <= 90:
-                    score += 35
-                else:
-                    score += 20
-            except:
-                pass
-        
-        scored_rfps.append({
-            **rfp,
-            "priority_score": score
-        })
+    # Basic qualification criteria
+    if record.value_inr is None:
+        return False
     
-    # Sort by score (descending)
-    scored_rfps.sort(key=lambda x: x["priority_score"], reverse=True)
+    # Check deadline is reasonable (at least 7 days away)
+    days_remaining = record.days_remaining(date.today())
+    if days_remaining is not None and days_remaining < MIN_DAYS_TO_BID:
+        return False
     
-    return scored_rfps[:5]  # Return top 5
+    return True
+
+
+def qualified_rfps(index: Optional[DeadlineIndex] = None) -> List[RFPRecord]:
+    """Helper to qualify a whole index (the RFP store's by default): only RFPs due 7+ days out (or undated) are checked"""
+    if index is None:
+        index = rfp_store.index()
+    earliest = date.today() + timedelta(days=MIN_DAYS_TO_BID)
+    candidates = index.due_between(earliest, date.max) + index.undated()
+    # The deadline rule is already met by the range query; only the value check remains
+    return [record for record in candidates if record.value_inr is not None]
+
+
+def prioritize_rfps_tool(rfps: List[Union[RFPRecord, dict]], limit: int = 5) -> List[dict]:
+    """Helper function to prioritize RFPs with the configured rules; returns the top `limit` as RFP dicts"""
+    records = [as_record(rfp) for rfp in rfps]
+    best = get_priority_engine().top(records, limit, date.today())
+    return [{**record.raw, "priority_score": round(score)} for score, record in best]
@@ -0,0 +1,299 @@
+"""
+Precomputed k-nearest-neighbour graph of substitute products.
+Each catalog product is scored against the others with the same 8-criterion
+spec match used for RFP requirements, so "alternatives for SKU X" is a dict
+lookup. The graph is persisted next to catalog.json (its only stored copy) and
+patched in place when products are added, updated or deleted. A stored graph
+for a slightly different catalog is patched the same way, using the per-SKU
+digests it was saved with, so only a missing or largely rewritten catalog pays
+for the full O(n²) build. Edits rescore only the affected lists, against the
+matcher the graph was built with (plus a small matcher over products added
+since); checking whether new products enter every other product's list, and
+saving, run on a background thread, never under the catalog store's lock.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set, Tuple
+
+from requirement_parser import RequirementSpec
+from backend.core.catalog_fields import NormalizedProduct
+from backend.core.units import VoltageRange
+from technical_agent.matcher import CatalogMatcher
+from technical_agent.scoring import CRITERION_WEIGHTS
+
+logger = logging.getLogger(__name__)
+
+# Neighbours kept per product
+ALTERNATIVES_K = int(os.getenv("ALTERNATIVES_K", "5"))
+# Written to the catalog's data directory
+ALTERNATIVES_FILE = "alternatives.json"
+# Bump when the stored layout or the similarity changes, so old files are rebuilt
+GRAPH_FORMAT = 2
+
+# Products changed since the base matcher was built, as a share of the catalog, before it is rebuilt
+REBASE_FRACTION = 0.05
+
+# One background thread for list refreshes and saves, so they apply in the order they were queued
+_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alternatives")
+
+# (alternative SKU, match percent)
+Neighbour = Tuple[str, float]
+
+
+def product_requirement(product: NormalizedProduct) -> RequirementSpec:
+    """A product's own specs phrased as a requirement, so other products can be scored against it"""
+    volts = product.voltage_volts
+    return RequirementSpec(
+        voltage=VoltageRange(volts, volts).label() if volts is not None else None,
+        voltage_volts=volts,
+        insulation=product.insulation or None,
+        cores=product.cores,
+        size=product.size,
+        conductor=product.conductor or None,
+        armour=product.armoured or None,
+        cable_type=product.category or None,
+        application=product.application or None,
+    )
+
+
+def _digest(product: NormalizedProduct) -> int:
+    """Hash of the fields that decide a product's neighbours (scored specs plus the price tie-break)"""
+    fields = (
+        product.sku, product.voltage_volts, product.insulation, product.cores, product.size,
+        product.conductor, product.armoured, product.category, product.application, product.price_per_meter,
+    )
+    return int.from_bytes(hashlib.sha1(repr(fields).encode("utf-8")).digest()[:8], "big")
+
+
+class AlternativesGraph:
+    """SKU -> its k best substitutes, best first (equal scores: lower price, then SKU)"""
+
+    def __init__(self, products: List[NormalizedProduct], k: int = ALTERNATIVES_K,
+                 path: Optional[str] = None, neighbours: Optional[Dict[str, List[Neighbour]]] = None,
+                 matcher: Optional[CatalogMatcher] = None):
+        self.k = k
+        self.path = path
+        self.products: Dict[str, NormalizedProduct] = {}
+        for product in products:
+            self.products.setdefault(product.sku, product)
+        # Per-product digests, saved with the graph to tell which products changed since
+        self.digests = {sku: _digest(product) for sku, product in self.products.items()}
+        # Matcher over the products as they were when it was built (the catalog's own matcher when it
+        # covers exactly these products), and the SKUs changed or added since
+        self._matcher = matcher if matcher is not None and matcher.products is products \
+            and len(products) == len(self.products) else None
+        self._dropped: Set[str] = set()
+        self._extra: Dict[str, NormalizedProduct] = {}
+        # Guards the state above against the background refresh; catalog edits only wait for its merges
+        self._lock = threading.RLock()
+        # Latest unsaved state, and refreshes still queued
+        self._pending: Optional[tuple] = None
+        self._pending_lock = threading.Lock()
+        self._refreshes = 0
+        if neighbours is None:
+            neighbours = self._compute(list(self.products))
+        self.neighbours = neighbours
+
+    @classmethod
+    def load_or_build(cls, products: List[NormalizedProduct], path: str, k: int = ALTERNATIVES_K,
+                      matcher: Optional[CatalogMatcher] = None) -> "AlternativesGraph":
+        """Reuse the graph stored at `path`, patched for any products that changed since it was saved;
+        build and store it from scratch if there is none or more than half the catalog changed.
+        `matcher` is reused for scoring if it was built over `products`."""
+        graph = cls(products, k, path, neighbours={}, matcher=matcher)
+        stored = None
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    stored = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable alternatives graph {path}: {e}")
+        if stored and stored.get("format") == GRAPH_FORMAT and stored.get("k") == k \
+                and stored.get("weights") == list(CRITERION_WEIGHTS):
+            stored_digests = {sku: int(digest, 16) for sku, digest in stored["digests"].items()}
+            removed = {sku for sku, digest in stored_digests.items() if graph.digests.get(sku) != digest}
+            added = [sku for sku, digest in graph.digests.items() if stored_digests.get(sku) != digest]
+            if len(removed) + len(added) <= len(graph.products) // 2:
+                graph.neighbours = {
+                    sku: [(alt, percent) for alt, percent in neighbours]
+                    for sku, neighbours in stored["neighbours"].items()
+                }
+                logger.info(f"Loaded alternatives graph for {len(graph.neighbours)} products from {path}")
+                if removed or added:
+                    graph._patch(removed, added)
+                    graph._merge_added(added, *graph._score_added(added))
+                    graph.save()
+                return graph
+
+        logger.info(f"Building alternatives graph for {len(graph.products)} products")
+        graph.neighbours = graph._compute(list(graph.products))
+        graph.save()
+        return graph
+
+    def _compute(self, skus: List[str]) -> Dict[str, List[Neighbour]]:
+        """Full neighbour lists for `skus` against every current product"""
+        if self._matcher is None:
+            self._matcher = CatalogMatcher(list(self.products.values()))
+            self._dropped, self._extra = set(), {}
+        specs = [product_requirement(self.products[sku]) for sku in skus]
+        # One extra match, since a product always matches its own specs, plus one per changed product
+        scored = self._matcher.match_batch(specs, self.k + 1 + len(self._dropped))
+        if not self._dropped and not self._extra:
+            return {
+                sku: [(m.sku, m.match_percent) for m in matches if m.sku != sku][:self.k]
+                for sku, matches in zip(skus, scored)
+            }
+
+        # Matches among products changed since the base matcher was built replace their old versions
+        extra = CatalogMatcher(list(self._extra.values())).match_batch(specs, self.k + 1) \
+            if self._extra else [[] for _ in skus]
+        neighbours = {}
+        for sku, matches, extra_matches in zip(skus, scored, extra):
+            candidates = [(m.sku, m.match_percent) for m in matches if m.sku not in self._dropped]
+            candidates += [(m.sku, m.match_percent) for m in extra_matches]
+            neighbours[sku] = sorted((c for c in candidates if c[0] != sku), key=self._rank)[:self.k]
+        return neighbours
+
+    def _rank(self, neighbour: Neighbour):
+        sku, match_percent = neighbour
+        return -match_percent, self.products[sku].price_per_meter, sku
+
+    def alternatives(self, sku: str, limit: Optional[int] = None) -> List[Tuple[NormalizedProduct, float]]:
+        """Best substitutes for a SKU as (product, match percent); empty for unknown SKUs"""
+        with self._lock:
+            neighbours = self.neighbours.get(sku, [])[:limit]
+            return [(self.products[alt], match_percent) for alt, match_percent in neighbours]
+
+    def apply_changes(self, changes) -> None:
+        """Patch the graph after catalog edits instead of rescoring every pair.
+
+        The changed products' own lists and the lists that named them are
+        rescored here; whether added products enter everyone else's top k is
+        checked on the background thread.
+        """
+        removed = set()
+        added: Dict[str, NormalizedProduct] = {}
+        with self._lock:
+            for old, new in changes:
+                if old is not None:
+                    removed.add(old.sku)
+                    added.pop(old.sku, None)
+                    self.products.pop(old.sku, None)
+                    self.digests.pop(old.sku, None)
+                    self._dropped.add(old.sku)
+                    self._extra.pop(old.sku, None)
+                if new is not None and new.sku not in self.products:
+                    self.products[new.sku] = new
+                    self.digests[new.sku] = _digest(new)
+                    added[new.sku] = new
+                    self._extra[new.sku] = new
+            if len(self._dropped) + len(self._extra) > max(32, REBASE_FRACTION * len(self.products)):
+                # Filtering that many changed products out of every result costs more than a fresh matcher
+                self._matcher = None
+            self._patch(removed, list(added))
+        if added:
+            with self._pending_lock:
+                self._refreshes += 1
+            _worker.submit(self._refresh, list(added))
+        self.save()
+
+    def _patch(self, removed: Set[str], added: List[str]) -> None:
+        """Drop `removed` SKUs (gone or changed) and compute full lists for `added` SKUs (new or changed,
+        already in self.products) and for every list that named a removed SKU"""
+        for sku in removed:
+            self.neighbours.pop(sku, None)
+        # Lists that named a changed product may lose it or reorder: rescore those in full
+        stale = {
+            sku for sku, neighbours in self.neighbours.items()
+            if any(alt in removed for alt, _ in neighbours)
+        }
+        to_compute = list(stale) + [sku for sku in added if sku not in stale]
+        if to_compute:
+            self.neighbours.update(self._compute(to_compute))
+
+    def _score_added(self, added: List[str]):
+        """Every other product's requirement scored against the `added` products, as
+        (scored SKUs with their digests, added SKUs with their digests, matches per scored SKU)"""
+        with self._lock:
+            products = [self.products[sku] for sku in added if sku in self.products]
+            added_digests = {product.sku: self.digests[product.sku] for product in products}
+            others = {sku: digest for sku, digest in self.digests.items() if sku not in added_digests}
+            specs = [product_requirement(self.products[sku]) for sku in others]
+        scored = CatalogMatcher(products).match_batch(specs, len(products)) if products else []
+        return others, added_digests, scored
+
+    def _merge_added(self, added: List[str], others: Dict[str, int], added_digests: Dict[str, int],
+                     scored: List[list]) -> None:
+        """Add the scored products to the other lists they now rank in, skipping anything edited meanwhile"""
+        with self._lock:
+            for (sku, digest), matches in zip(others.items(), scored):
+                if self.digests.get(sku) != digest or sku not in self.neighbours:
+                    continue
+                current = self.neighbours[sku]
+                listed = {alt for alt, _ in current}
+                candidates = [
+                    (m.sku, m.match_percent) for m in matches
+                    if m.sku not in listed and self.digests.get(m.sku) == added_digests[m.sku]
+                ]
+                if candidates:
+                    self.neighbours[sku] = sorted(current + candidates, key=self._rank)[:self.k]
+
+    def _refresh(self, added: List[str]) -> None:
+        try:
+            # Scoring runs without the graph lock; only the merge takes it
+            self._merge_added(added, *self._score_added(added))
+            self.save()
+        except Exception as e:
+            logger.warning(f"Could not refresh alternatives for {len(added)} new products: {e}")
+        finally:
+            with self._pending_lock:
+                self._refreshes -= 1
+
+    def save(self) -> None:
+        """Queue an atomic write of the current graph; a read-only data directory only costs a rebuild next start.
+
+        Only shallow copies are taken here (neighbour lists are replaced, never
+        mutated), so callers holding the catalog store's lock are not held up by
+        the JSON encoding or the disk.
+        """
+        if not self.path:
+            return
+        with self._lock:
+            state = (dict(self.neighbours), dict(self.digests))
+        with self._pending_lock:
+            scheduled = self._pending is not None
+            self._pending = state
+        if not scheduled:
+            _worker.submit(self._write)
+
+    def flush(self) -> None:
+        """Wait until queued refreshes and saves are done"""
+        while True:
+            _worker.submit(lambda: None).result()
+            with self._pending_lock:
+                if self._pending is None and not self._refreshes:
+                    return
+
+    def _write(self) -> None:
+        # Saves queued while an earlier one was waiting are written once, as the latest state
+        with self._pending_lock:
+            (neighbours, digests), self._pending = self._pending, None
+        data = {
+            "format": GRAPH_FORMAT,
+            "k": self.k,
+            "weights": list(CRITERION_WEIGHTS),
+            "digests": {sku: f"{digest:016x}" for sku, digest in digests.items()},
+            "neighbours": neighbours,
+        }
+        # Per-thread temp file: the agents' modules may be imported under two names, each with a worker
+        tmp_path = f"{self.path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not persist alternatives graph to {self.path}: {e}")
@@ -0,0 +1,130 @@
+"""
+Attribute inverted index over the OEM catalog.
+Lets the matcher score only products that can reach a non-zero spec match.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Any, Dict, List, Set, Tuple
+
+from requirement_parser import RequirementSpec
+from backend.core.catalog_fields import NormalizedProduct
+
+
+# Widens bisect windows slightly so float rounding never drops a boundary value;
+# candidates are re-checked with the exact scoring rule afterwards
+_RANGE_SLACK = 1e-9
+
+
+def _sorted_column(products: List[NormalizedProduct], key: str) -> Tuple[List[float], List[int]]:
+    """Sorted numeric values with their row ids (zero/missing are None and can never match)"""
+    pairs = sorted(
+        (float(value), row) for row, value in ((row, getattr(p, key)) for row, p in enumerate(products))
+        if value is not None
+    )
+    return [value for value, _ in pairs], [row for _, row in pairs]
+
+
+def _build_postings(products: List[NormalizedProduct], key_fn) -> Dict[Any, Set[int]]:
+    postings = defaultdict(set)
+    for row, product in enumerate(products):
+        postings[key_fn(product)].add(row)
+    return dict(postings)
+
+
+class CatalogIndex:
+    """Postings from attribute value to catalog row ids, built once per catalog load.
+
+    Row ids (positions in the catalog list) are stored instead of SKUs so
+    candidates can be scored in catalog order, which keeps tie ordering
+    identical to a full scan.
+    """
+
+    def __init__(self, products: List[NormalizedProduct]):
+        self.products = products
+        self.voltage = _build_postings(products, lambda p: p.voltage_volts)
+        self.insulation = _build_postings(products, lambda p: p.insulation)
+        self.conductor = _build_postings(products, lambda p: p.conductor)
+        self.category = _build_postings(products, lambda p: p.category)
+        self.application = _build_postings(products, lambda p: p.application)
+        self.cores_values, self.cores_rows = _sorted_column(products, "cores")
+        self.size_values, self.size_rows = _sorted_column(products, "size")
+        self.available_sizes = sorted(set(self.size_values))
+        self.armoured = {row for row, p in enumerate(products) if p.armoured}
+
+    @staticmethod
+    def _substring_rows(postings: Dict[str, Set[int]], needle: str) -> Set[int]:
+        rows = set()
+        for value, value_rows in postings.items():
+            if needle in value:
+                rows |= value_rows
+        return rows
+
+    @staticmethod
+    def _range(values: List[float], rows: List[int], low: float, high: float):
+        """(value, row) pairs with low <= value <= high, via bisect on the sorted column"""
+        start = bisect_left(values, low - abs(low) * _RANGE_SLACK)
+        end = bisect_right(values, high + abs(high) * _RANGE_SLACK)
+        return zip(values[start:end], rows[start:end])
+
+    def cores_rows_near(self, cores: float) -> List[int]:
+        """Rows with exactly `cores` cores or within 2 cores of it"""
+        return [
+            row for value, row in self._range(self.cores_values, self.cores_rows, cores - 2, cores + 2)
+            if value == cores or abs(value - cores) <= 2
+        ]
+
+    def size_rows_near(self, size: float) -> List[int]:
+        """Rows with exactly `size` sqmm or within 25% of it"""
+        return [
+            row for value, row in self._range(self.size_values, self.size_rows, size * 0.75, size * 1.25)
+            if value == size or abs(value - size) / size <= 0.25
+        ]
+
+    def has_size(self, size: float) -> bool:
+        i = bisect_left(self.available_sizes, size)
+        return i < len(self.available_sizes) and self.available_sizes[i] == size
+
+    def closest_sizes(self, size: float, limit: int = 2) -> List[float]:
+        """Up to `limit` distinct catalog sizes nearest to `size`, nearest first"""
+        values = self.available_sizes
+        i = bisect_left(values, size)
+        lo, hi = i - 1, i
+        closest = []
+        while len(closest) < limit and (lo >= 0 or hi < len(values)):
+            if hi >= len(values) or (lo >= 0 and size - values[lo] <= values[hi] - size):
+                closest.append(values[lo])
+                lo -= 1
+            else:
+                closest.append(values[hi])
+                hi += 1
+        return closest
+
+    def candidates(self, req_specs: RequirementSpec) -> List[int]:
+        """Row ids (in catalog order) matching at least one requested criterion, fully or partially"""
+        rows = set()
+
+        if req_specs.voltage_volts is not None:
+            rows |= self.voltage.get(req_specs.voltage_volts, set())
+
+        if req_specs.insulation:
+            rows |= self._substring_rows(self.insulation, req_specs.insulation.lower())
+
+        if req_specs.cores:
+            rows.update(self.cores_rows_near(req_specs.cores))
+
+        if req_specs.size:
+            rows.update(self.size_rows_near(req_specs.size))
+
+        if req_specs.conductor:
+            rows |= self._substring_rows(self.conductor, req_specs.conductor.lower())
+
+        if req_specs.armour:
+            rows |= self.armoured
+
+        if req_specs.cable_type:
+            rows |= self._substring_rows(self.category, req_specs.cable_type.lower())
+
+        if req_specs.application:
+            rows |= self._substring_rows(self.application, req_specs.application.lower())
+
+        return sorted(rows)
@@ -0,0 +1,58 @@
+"""
+Catalog matcher: owns the derived matching structures for one catalog snapshot
+and picks the NumPy engine or the indexed per-product fallback.
+"""
+from typing import List
+
+from requirement_parser import RequirementSpec
+from backend.core.catalog_fields import NormalizedProduct
+from backend.core.topk import top_k as select_top_k
+from technical_agent.catalog_index import CatalogIndex
+from technical_agent.scoring import (
+    MATCH_STANDARDS_FILTER, NUMPY_AVAILABLE, ColumnarCatalog, MatchResult, compile_plan, explain_match,
+    score_products, tie_ranks,
+)
+from technical_agent.standards_index import StandardsIndex, bitset_rows
+
+
+class CatalogMatcher:
+    """Spec matcher over a fixed list of normalized catalog records"""
+
+    def __init__(self, products: List[NormalizedProduct]):
+        self.products = products
+        self.index = CatalogIndex(products)
+        self.standards = StandardsIndex(products)
+        self.tie_rank = tie_ranks(products)
+        self.columnar = ColumnarCatalog(products, self.tie_rank, self.standards) if NUMPY_AVAILABLE else None
+
+    def match_batch(self, specs_list: List[RequirementSpec], top_k: int = 3) -> List[List[MatchResult]]:
+        """Top-k matches for each requirement, in input order; equal scores go to the lower price, then SKU"""
+        if self.columnar is not None:
+            return self.columnar.top_matches_batch(specs_list, limit=top_k)
+
+        results = {}
+        for req_specs in specs_list:
+            if req_specs not in results:
+                # Products outside the index candidates cannot score above 0%
+                candidates = self.index.candidates(req_specs)
+                if req_specs.standards:
+                    # Meeting a required standard alone also earns credit
+                    rows = set(candidates).union(bitset_rows(self.standards.partially_compliant(req_specs.standards)))
+                    if MATCH_STANDARDS_FILTER:
+                        compliant = self.standards.compliant(req_specs.standards)
+                        rows = {row for row in rows if compliant >> row & 1}
+                    candidates = sorted(rows)
+                scored = score_products(self.products, candidates, req_specs)
+                best = select_top_k(scored, top_k, score=lambda x: x[0], tie_break=lambda x: self.tie_rank[x[1]])
+                active = compile_plan(req_specs).active
+                results[req_specs] = [
+                    explain_match(self.products[row], match_percent, active, hit, close)
+                    for match_percent, row, hit, close in best
+                ]
+        return [results[req_specs] for req_specs in specs_list]
+
+    def size_alternatives(self, req_specs: RequirementSpec, limit: int = 2) -> List[float]:
+        """Closest catalog sizes when the requested size is not stocked at all"""
+        if not req_specs.size or self.index.has_size(req_specs.size):
+            return []
+        return self.index.closest_sizes(req_specs.size, limit)
@@ -8,10 +8,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from state import AgentState, WorkflowStep, NodeName
 from llm_config import get_shared_llm
+from backend.core.units import quantity_in_metres
 from technical_agent.tools import (
-    match_rfp_requirement_to_products,
+    match_requirements_batch,
+    format_match_table,
+    closest_available_sizes,
     load_oem_catalog,
-    OEM_PRODUCT_CATALOG,
 )
 
 
@@ -36,7 +38,7 @@ TECHNICAL_AGENT_PROMPT = """You are a Technical Agent specialized in product spe
 - Fire Retardant Cables (FR-LSH)
 - Specialty Cables (Flexible, Welding, Earthing)
 
-**Matching Criteria (8 Parameters - Equal Weight):**
+**Matching Criteria (8 Parameters - Equal Weight, plus Standards when the RFP lists them):**
 1. Voltage Grade (11 kV, 1.1 kV, 450/750 V, etc.)
 2. Conductor Material (Copper, Aluminium)
 3. Conductor Size (sqmm)
@@ -45,6 +47,7 @@ TECHNICAL_AGENT_PROMPT = """You are a Technical Agent specialized in product spe
 6. Armour (if required)
 7. Cable Type (Power, Control, Instrumentation, etc.)
 8. Application (Underground, Overhead, Industrial)
+9. Standards Compliance (IS 7098, IEC 60502, etc.; partial credit when only some are met)
 
 **Output Format:**
 Present a structured matching report containing:
@@ -100,28 +103,28 @@ def technical_agent_node(state: AgentState) -> Dict[str, Any]:
         products_for_pricing = []
         matching_results_text = "## Product Matching Results\n\n"
         
-        for item in scope_of_supply:
-            requirement = item.get("item", "")
+        requirements = [item.get("item", "") for item in scope_of_supply]
+        standards = (selected_rfp.get("technical_specs") or {}).get("standards")
+        print(f"🔍 Matching {len(requirements)} requirements in one batch")
+        batch_matches = match_requirements_batch(requirements, standards=standards)
+        
+        for item, requirement, top_matches in zip(scope_of_supply, requirements, batch_matches):
             quantity_str = item.get("quantity", "")
             
-            print(f"🔍 Matching: {requirement}")
-            
-            match_result = match_rfp_requirement_to_products.invoke({"rfp_requirement": requirement})
+            match_result = format_match_table(requirement, top_matches, closest_available_sizes(requirement))
             matching_results_text += f"### Requirement: {requirement} (Qty: {quantity_str})\n\n"
             matching_results_text += match_result + "\n\n"
             
             all_matches.append({
                 "requirement": requirement,
                 "quantity": quantity_str,
-                "matches": match_result
+                "matches": [m.to_dict() for m in top_matches]
             })
             
-            import re
-            qty_num = int(re.sub(r'[^\d]', '', quantity_str)) if quantity_str else 1000
+            qty_num = quantity_in_metres(quantity_str, default=1000)
             
-            sku_match = re.search(r'\|\s*1\s*\|\s*([A-Z0-9\-\.]+)', match_result)
-            if sku_match:
-                top_sku = sku_match.group(1)
+            if top_matches:
+                top_sku = top_matches[0].sku
                 products_for_pricing.append({
                     "sku": top_sku,
                     "quantity": qty_num,
@@ -139,7 +142,7 @@ def technical_agent_node(state: AgentState) -> Dict[str, Any]:
 
 ## Summary
 - Total requirements analyzed: {len(scope_of_supply)}
-- OEM products in catalog: {len(OEM_PRODUCT_CATALOG)}
+- OEM products in catalog: {len(load_oem_catalog())}
 
 **Next Step:** Proceeding to pricing analysis based on matched products.
 """
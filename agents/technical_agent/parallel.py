@@ -0,0 +1,122 @@
+"""
+Opt-in process-pool matching for very large scopes of supply.
+Each worker receives the catalog snapshot once, through the pool initializer,
+and builds its own CatalogMatcher; tasks only carry parsed requirements.
+A pool replaced for a new snapshot is retired, not shut down under its
+callers: it closes once the calls already using it have returned.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from typing import List, Optional
+
+from requirement_parser import RequirementSpec
+from backend.core.catalog_fields import NormalizedProduct
+from technical_agent.matcher import CatalogMatcher
+from technical_agent.scoring import MatchResult
+
+logger = logging.getLogger(__name__)
+
+# 0 keeps matching serial; set to the number of worker processes to enable
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", "0"))
+# Below this many distinct requirements the serial matcher is faster than a round trip to the pool
+MATCH_PARALLEL_MIN_ITEMS = int(os.getenv("MATCH_PARALLEL_MIN_ITEMS", "200"))
+# Shards per worker, so one slow shard does not leave the other workers idle
+SHARDS_PER_WORKER = 4
+
+_worker_matcher: Optional[CatalogMatcher] = None
+
+
+def _init_worker(products: List[NormalizedProduct]) -> None:
+    global _worker_matcher
+    _worker_matcher = CatalogMatcher(products)
+
+
+def _match_shard(specs_list: List[RequirementSpec], top_k: int) -> List[List[MatchResult]]:
+    return _worker_matcher.match_batch(specs_list, top_k)
+
+
+class ParallelMatcher:
+    """Shards requirements across a ProcessPoolExecutor bound to one catalog snapshot"""
+
+    def __init__(self, products: List[NormalizedProduct], workers: int, min_items: int = MATCH_PARALLEL_MIN_ITEMS):
+        self.products = products
+        self.workers = workers
+        self.min_items = min_items
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(products,)
+        )
+        # Calls currently using the pool, and whether it closes once they are done
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._retired = False
+
+    def match_batch(self, specs_list: List[RequirementSpec], top_k: int,
+                    serial: CatalogMatcher) -> List[List[MatchResult]]:
+        """Top-k matches per requirement in input order; small inputs, and calls on a retired or
+        broken pool, run on the serial matcher"""
+        unique_specs = list(dict.fromkeys(specs_list))
+        if len(unique_specs) < self.min_items:
+            return serial.match_batch(specs_list, top_k)
+
+        with self._lock:
+            if self._retired:
+                return serial.match_batch(specs_list, top_k)
+            self._in_flight += 1
+        try:
+            shard_count = min(len(unique_specs), self.workers * SHARDS_PER_WORKER)
+            shard_size = -(-len(unique_specs) // shard_count)
+            shards = [unique_specs[i:i + shard_size] for i in range(0, len(unique_specs), shard_size)]
+
+            by_spec = {}
+            results = self._executor.map(_match_shard, shards, [top_k] * len(shards))
+            for shard, shard_results in zip(shards, results):
+                by_spec.update(zip(shard, shard_results))
+            return [by_spec[spec] for spec in specs_list]
+        except (CancelledError, RuntimeError) as e:
+            # Includes BrokenProcessPool (a worker died) and a pool shut down at exit
+            logger.warning(f"Parallel matching failed, matching serially: {e}")
+            return serial.match_batch(specs_list, top_k)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                close = self._retired and not self._in_flight
+            if close:
+                self._executor.shutdown(wait=False)
+
+    def retire(self) -> None:
+        """Close the pool once the calls already using it return; later calls run serially"""
+        with self._lock:
+            self._retired = True
+            close = not self._in_flight
+        if close:
+            self._executor.shutdown(wait=False)
+
+
+_parallel_matcher: Optional[ParallelMatcher] = None
+_parallel_lock = threading.Lock()
+
+
+def get_parallel_matcher(products: List[NormalizedProduct], workers: int = MATCH_WORKERS) -> Optional[ParallelMatcher]:
+    """Shared pool for the given catalog snapshot, or None when parallel matching is disabled.
+
+    The pool is recreated when the catalog list is replaced so workers never
+    score against a stale snapshot; callers keep the matcher they were given,
+    and the old pool is retired rather than shut down under them.
+    """
+    global _parallel_matcher
+    if workers <= 0:
+        return None
+
+    with _parallel_lock:
+        if _parallel_matcher is not None and (
+            _parallel_matcher.products is not products or _parallel_matcher.workers != workers
+        ):
+            _parallel_matcher.retire()
+            _parallel_matcher = None
+
+        if _parallel_matcher is None:
+            logger.info(f"Starting parallel matcher with {workers} workers")
+            _parallel_matcher = ParallelMatcher(products, workers)
+        return _parallel_matcher
@@ -0,0 +1,476 @@
+"""
+Spec match scoring engines for the technical agent.
+Each requirement is compiled once into a ScoringPlan holding only its active
+criteria and their weights. ColumnarCatalog scores the whole catalog in one
+NumPy pass; score_products runs the plan one criterion at a time and is the
+reference implementation used when NumPy is unavailable.
+"""
+import logging
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import compress
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from requirement_parser import RequirementSpec
+from backend.core.catalog_fields import NormalizedProduct
+from technical_agent.standards_index import StandardsIndex, meets_standards
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    logging.warning("NumPy not available, falling back to per-product spec scoring")
+
+# Per-criterion outcome codes
+MISS, HIT, CLOSE = 0, 1, 2
+
+# Max requirement x product cells scored per batch block (~8 MB of float64 scores)
+BATCH_CELL_BUDGET = 1_000_000
+
+# Criterion labels in scoring order; Standards only applies when a requirement lists standards
+CRITERIA = ("Voltage", "Insulation", "Cores", "Size", "Conductor", "Armour", "Cable Type", "Application", "Standards")
+
+
+# Bit of each criterion in the hit/close/active masks
+CRITERION_BITS = {label: 1 << i for i, label in enumerate(CRITERIA)}
+VOLTAGE, INSULATION, CORES, SIZE, CONDUCTOR, ARMOUR, CABLE_TYPE, APPLICATION, STANDARDS = CRITERION_BITS.values()
+
+# Compiled plans cached per distinct requirement
+PLAN_CACHE_SIZE = 4096
+
+
+def parse_weights(text: str) -> Tuple[float, ...]:
+    """Criterion weights in CRITERIA order from e.g. 'voltage=2,cable_type=0.5'; unlisted criteria weigh 1"""
+    keys = {label.lower().replace(" ", "_"): i for i, label in enumerate(CRITERIA)}
+    weights = [1.0] * len(CRITERIA)
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        name, _, value = item.partition("=")
+        name = name.strip().lower().replace(" ", "_")
+        if name not in keys:
+            raise ValueError(f"Unknown match criterion '{name}' (expected one of: {', '.join(keys)})")
+        weights[keys[name]] = float(value)
+    return tuple(weights)
+
+
+# Weight 0 disables a criterion; e.g. MATCH_WEIGHTS="voltage=2" counts voltage double
+CRITERION_WEIGHTS = parse_weights(os.getenv("MATCH_WEIGHTS", ""))
+
+# 1 drops products missing any required standard before scoring, instead of only scoring them lower
+MATCH_STANDARDS_FILTER = os.getenv("MATCH_STANDARDS_FILTER", "0") == "1"
+
+
+@dataclass
+class MatchResult:
+    """One scored catalog product for a requirement.
+
+    Criterion outcomes are kept as bitmasks; the per-criterion labels are only
+    built when a caller asks for them.
+    """
+    sku: str
+    name: str
+    match_percent: float
+    # Criteria the requirement specified, and which of those hit fully / partially
+    active_mask: int
+    hit_mask: int
+    close_mask: int
+    price: float
+    specs: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def criteria(self) -> Tuple[Tuple[str, int], ...]:
+        """(criterion label, MISS/HIT/CLOSE) for each criterion the requirement specified"""
+        return tuple(
+            (label, HIT if self.hit_mask & bit else CLOSE if self.close_mask & bit else MISS)
+            for label, bit in CRITERION_BITS.items() if self.active_mask & bit
+        )
+
+    @property
+    def match_details(self) -> List[str]:
+        """Human-readable criterion flags, e.g. ['✓ Voltage', '~ Size (close)']"""
+        details = []
+        for label, outcome in self.criteria:
+            if outcome == HIT:
+                details.append(f"✓ {label}")
+            elif outcome == CLOSE:
+                details.append(f"~ {label} (close)")
+            else:
+                details.append(f"✗ {label}")
+        return details
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sku": self.sku,
+            "name": self.name,
+            "match_percent": self.match_percent,
+            "match_details": self.match_details,
+            "price": self.price,
+            "specs": self.specs,
+        }
+
+
+# Per-criterion tests. Each builder binds one requirement value and returns a
+# function mapping the candidate products to (hit positions, close positions),
+# so a plan runs one tight comprehension per criterion instead of branching per product.
+CriterionTest = Callable[[List[NormalizedProduct]], Tuple[List[int], List[int]]]
+
+
+def _voltage_test(req_specs: RequirementSpec) -> CriterionTest:
+    volts = req_specs.voltage_volts
+    get = attrgetter("voltage_volts")
+
+    def test(products):
+        if volts is None:
+            return [], []
+        return [i for i, v in enumerate(map(get, products)) if v == volts], []
+    return test
+
+
+def _contains_test(value: str, attribute: str) -> CriterionTest:
+    needle = value.lower()
+    get = attrgetter(attribute)
+
+    def test(products):
+        return [i for i, v in enumerate(map(get, products)) if needle in v], []
+    return test
+
+
+def _armour_test(req_specs: RequirementSpec) -> CriterionTest:
+    def test(products):
+        return list(compress(range(len(products)), map(attrgetter("armoured"), products))), []
+    return test
+
+
+def _cores_test(req_specs: RequirementSpec) -> CriterionTest:
+    target = req_specs.cores
+
+    def test(products):
+        hits, closes = [], []
+        for i, v in enumerate(map(attrgetter("cores"), products)):
+            if v == target:
+                hits.append(i)
+            elif v and abs(v - target) <= 2:
+                closes.append(i)
+        return hits, closes
+    return test
+
+
+def _size_test(req_specs: RequirementSpec) -> CriterionTest:
+    target = req_specs.size
+
+    def test(products):
+        hits, closes = [], []
+        for i, v in enumerate(map(attrgetter("size"), products)):
+            if v == target:
+                hits.append(i)
+            elif v and abs(v - target) / target <= 0.25:
+                closes.append(i)
+        return hits, closes
+    return test
+
+
+def _standards_test(req_specs: RequirementSpec) -> CriterionTest:
+    required = req_specs.standards
+    get = attrgetter("standards")
+
+    def test(products):
+        # All required standards met is a hit, some of them close; few distinct lists, so memoize
+        outcomes: Dict[Tuple[str, ...], int] = {}
+        hits, closes = [], []
+        for i, standards in enumerate(map(get, products)):
+            outcome = outcomes.get(standards)
+            if outcome is None:
+                met, total = meets_standards(standards, required)
+                outcome = outcomes[standards] = HIT if met == total else CLOSE if met else MISS
+            if outcome == HIT:
+                hits.append(i)
+            elif outcome == CLOSE:
+                closes.append(i)
+        return hits, closes
+    return test
+
+
+# (criterion bit, is it specified?, test builder), in scoring order
+_CRITERION_TESTS = (
+    (VOLTAGE, lambda r: r.voltage, _voltage_test),
+    (INSULATION, lambda r: r.insulation, lambda r: _contains_test(r.insulation, "insulation")),
+    (CORES, lambda r: r.cores, _cores_test),
+    (SIZE, lambda r: r.size, _size_test),
+    (CONDUCTOR, lambda r: r.conductor, lambda r: _contains_test(r.conductor, "conductor")),
+    (ARMOUR, lambda r: r.armour, _armour_test),
+    (CABLE_TYPE, lambda r: r.cable_type, lambda r: _contains_test(r.cable_type, "category")),
+    (APPLICATION, lambda r: r.application, lambda r: _contains_test(r.application, "application")),
+    (STANDARDS, lambda r: r.standards, _standards_test),
+)
+
+
+@dataclass(frozen=True)
+class ScoringPlan:
+    """A requirement compiled to the criteria it actually specifies.
+
+    steps holds (criterion bit, test, weight) for active criteria only, so
+    scoring never re-checks which fields the requirement set.
+    """
+    active: int
+    steps: Tuple[Tuple[int, CriterionTest, float], ...]
+    # Weight per criterion in CRITERIA order, 0 for inactive ones (used by the NumPy engine)
+    weights: Tuple[float, ...]
+    total_weight: float
+
+
+@lru_cache(maxsize=PLAN_CACHE_SIZE)
+def compile_plan(req_specs: RequirementSpec, weights: Tuple[float, ...] = CRITERION_WEIGHTS) -> ScoringPlan:
+    """Compile (and cache) the scoring plan for a requirement under the given criterion weights"""
+    steps = []
+    plan_weights = [0.0] * len(CRITERIA)
+    for i, (bit, specified, build_test) in enumerate(_CRITERION_TESTS):
+        if specified(req_specs) and weights[i] > 0:
+            steps.append((bit, build_test(req_specs), weights[i]))
+            plan_weights[i] = weights[i]
+    return ScoringPlan(
+        active=sum(bit for bit, _, _ in steps),
+        steps=tuple(steps),
+        weights=tuple(plan_weights),
+        total_weight=sum(plan_weights),
+    )
+
+
+def score_products(products: List[NormalizedProduct], rows: Iterable[int],
+                   req_specs: RequirementSpec) -> List[Tuple[float, int, int, int]]:
+    """Score the given catalog rows against the requirement's compiled plan, one criterion at a time.
+
+    Returns (match_percent, row, hit_mask, close_mask) for every row scoring
+    above 0%; use explain_match() to turn the rows that are kept into MatchResults.
+    """
+    plan = compile_plan(req_specs)
+    if not plan.steps:
+        return []
+
+    rows = list(rows)
+    candidates = [products[row] for row in rows]
+    hit = [0] * len(rows)
+    close = [0] * len(rows)
+    score = [0.0] * len(rows)
+    for bit, test, weight in plan.steps:
+        hits, closes = test(candidates)
+        for i in hits:
+            hit[i] |= bit
+            score[i] += weight
+        # Close matches earn half credit
+        for i in closes:
+            close[i] |= bit
+            score[i] += 0.5 * weight
+
+    total_weight = plan.total_weight
+    return [
+        ((score[i] / total_weight) * 100, rows[i], hit[i], close[i])
+        for i in compress(range(len(rows)), score)
+    ]
+
+
+def explain_match(product: NormalizedProduct, match_percent: float, active: int, hit: int, close: int) -> MatchResult:
+    """Materialize the MatchResult for one product that made the top-k"""
+    record = product.record
+    return MatchResult(
+        sku=record["sku"],
+        name=record["name"],
+        match_percent=match_percent,
+        active_mask=active,
+        hit_mask=hit,
+        close_mask=close,
+        price=record["base_price_per_meter"],
+        specs=record["specs"],
+    )
+
+
+def tie_ranks(products: List[NormalizedProduct]) -> List[int]:
+    """Per-row rank used to order equal match scores: lower price first, then SKU"""
+    order = sorted(range(len(products)), key=lambda row: (products[row].price_per_meter, products[row].sku))
+    ranks = [0] * len(products)
+    for rank, row in enumerate(order):
+        ranks[row] = rank
+    return ranks
+
+
+def _numeric(value) -> float:
+    # Missing values become NaN, which never compares equal or within tolerance
+    return float(value) if value is not None else float("nan")
+
+
+class ColumnarCatalog:
+    """Catalog specs held as NumPy columns for single-pass scoring.
+
+    String attributes are stored as categorical codes into a small vocabulary,
+    so each requirement evaluates its string test once per distinct value
+    and then gathers the result for every product with one array lookup.
+    """
+
+    def __init__(self, products: List[NormalizedProduct], ranks: Optional[List[int]] = None,
+                 standards: Optional[StandardsIndex] = None):
+        self.products = products
+        self.standards = standards if standards is not None else StandardsIndex(products)
+        self.tie_rank = np.array(ranks if ranks is not None else tie_ranks(products), dtype=np.int64)
+        self.voltage = np.array([_numeric(p.voltage_volts) for p in products], dtype=np.float64)
+        self.insulation_vocab, self.insulation = self._encode(p.insulation for p in products)
+        self.conductor_vocab, self.conductor = self._encode(p.conductor for p in products)
+        self.category_vocab, self.category = self._encode(p.category for p in products)
+        self.application_vocab, self.application = self._encode(p.application for p in products)
+        self.cores = np.array([_numeric(p.cores) for p in products], dtype=np.float64)
+        self.size = np.array([_numeric(p.size) for p in products], dtype=np.float64)
+        self.armoured = np.array([p.armoured for p in products], dtype=bool)
+
+    def _bitset_array(self, mask: int):
+        """Bool column for a row bitset"""
+        n = len(self.products)
+        packed = np.frombuffer(mask.to_bytes((n + 7) // 8, "little"), dtype=np.uint8)
+        return np.unpackbits(packed, count=n, bitorder="little").astype(bool)
+
+    def _standards_matrix(self, specs_list: List[RequirementSpec]):
+        """Outcome matrix for the standards criterion: all required standards met, or some of them"""
+        rows = {}
+        matrix = np.zeros((len(specs_list), len(self.products)), dtype=np.int8)
+        for i, s in enumerate(specs_list):
+            if not s.standards:
+                continue
+            if s.standards not in rows:
+                compliant = self._bitset_array(self.standards.compliant(s.standards))
+                partial = self._bitset_array(self.standards.partially_compliant(s.standards))
+                rows[s.standards] = np.where(compliant, HIT, np.where(partial, CLOSE, MISS))
+            matrix[i] = rows[s.standards]
+        return matrix
+
+    @staticmethod
+    def _encode(values: Iterable[Any]):
+        vocab: Dict[Any, int] = {}
+        codes = [vocab.setdefault(v, len(vocab)) for v in values]
+        return list(vocab), np.array(codes, dtype=np.int32)
+
+    @staticmethod
+    def _string_matrix(vocab: List[Any], codes, needles: List[Any], predicate):
+        """(requirements x products) bool matrix of predicate(needle, value); None needles never match"""
+        tables = {}
+        table = np.zeros((len(needles), len(vocab)), dtype=bool)
+        for i, needle in enumerate(needles):
+            if needle is None:
+                continue
+            if needle not in tables:
+                tables[needle] = np.fromiter(
+                    (predicate(needle, v) for v in vocab), dtype=bool, count=len(vocab)
+                )
+            table[i] = tables[needle]
+        return table[:, codes]
+
+    @staticmethod
+    def _numeric_matrix(column, targets: List[Any], tolerance):
+        """Outcome matrix for a numeric criterion: exact hit, or close when within tolerance(diff, target)"""
+        target = np.array([_numeric(t) for t in targets], dtype=np.float64)[:, None]
+        exact = column[None, :] == target
+        close = ~exact & tolerance(np.abs(column[None, :] - target), target)
+        return np.where(exact, HIT, np.where(close, CLOSE, MISS)).astype(np.int8)
+
+    def _outcome_matrices(self, specs_list: List[RequirementSpec], plans: List[ScoringPlan]):
+        """Per-criterion (weight column, outcome matrix) for a block of requirements.
+
+        Criteria that no plan in the block uses are skipped entirely.
+        """
+
+        def lowered(values):
+            return [v.lower() if v else None for v in values]
+
+        def contains(needle, value):
+            return needle in value
+
+        builders = {
+            "Voltage": lambda: self.voltage[None, :] == np.array(
+                [_numeric(s.voltage_volts) for s in specs_list], dtype=np.float64
+            )[:, None],
+            "Insulation": lambda: self._string_matrix(
+                self.insulation_vocab, self.insulation, lowered(s.insulation for s in specs_list), contains
+            ),
+            "Cores": lambda: self._numeric_matrix(
+                self.cores, [s.cores for s in specs_list], lambda diff, target: diff <= 2
+            ),
+            "Size": lambda: self._numeric_matrix(
+                self.size, [s.size for s in specs_list], lambda diff, target: diff / target <= 0.25
+            ),
+            "Conductor": lambda: self._string_matrix(
+                self.conductor_vocab, self.conductor, lowered(s.conductor for s in specs_list), contains
+            ),
+            "Armour": lambda: np.broadcast_to(self.armoured, (len(specs_list), len(self.products))),
+            "Cable Type": lambda: self._string_matrix(
+                self.category_vocab, self.category, lowered(s.cable_type for s in specs_list), contains
+            ),
+            "Application": lambda: self._string_matrix(
+                self.application_vocab, self.application, lowered(s.application for s in specs_list), contains
+            ),
+            "Standards": lambda: self._standards_matrix(specs_list),
+        }
+        weights = np.array([plan.weights for plan in plans], dtype=np.float64).reshape(len(plans), len(CRITERIA))
+        return {
+            label: (weights[:, j], np.asarray(builders[label](), dtype=np.int8))
+            for j, label in enumerate(CRITERIA) if weights[:, j].any()
+        }
+
+    def _score_block(self, specs_list: List[RequirementSpec], limit: int) -> List[List[MatchResult]]:
+        n_reqs, n_products = len(specs_list), len(self.products)
+        plans = [compile_plan(s) for s in specs_list]
+        criteria = self._outcome_matrices(specs_list, plans)
+
+        score = np.zeros((n_reqs, n_products), dtype=np.float64)
+        for weight, outcome in criteria.values():
+            credit = np.where(outcome == HIT, 1.0, np.where(outcome == CLOSE, 0.5, 0.0))
+            score += credit * weight[:, None]
+
+        results = []
+        for i, plan in enumerate(plans):
+            if not plan.steps:
+                results.append([])
+                continue
+            match_percent = (score[i] / plan.total_weight) * 100
+            if MATCH_STANDARDS_FILTER and specs_list[i].standards:
+                match_percent = np.where(self._bitset_array(self.standards.compliant(specs_list[i].standards)),
+                                         match_percent, 0.0)
+            rows = np.flatnonzero(match_percent > 0)
+            if len(rows) > limit:
+                # Keep rows scoring at least the k-th best (ties included), then order only those
+                kth = np.partition(match_percent[rows], len(rows) - limit)[len(rows) - limit]
+                rows = rows[match_percent[rows] >= kth]
+            rows = rows[np.lexsort((self.tie_rank[rows], -match_percent[rows]))][:limit]
+
+            # Criterion masks are only assembled for the rows that are returned
+            matches = []
+            for row in rows.tolist():
+                hit = close = 0
+                for label, (weight, outcome) in criteria.items():
+                    if weight[i]:
+                        if outcome[i, row] == HIT:
+                            hit |= CRITERION_BITS[label]
+                        elif outcome[i, row] == CLOSE:
+                            close |= CRITERION_BITS[label]
+                matches.append(explain_match(self.products[row], float(match_percent[row]), plan.active, hit, close))
+            results.append(matches)
+        return results
+
+    def top_matches_batch(self, specs_list: List[RequirementSpec], limit: int = 3) -> List[List[MatchResult]]:
+        """Top matches for many requirements, scored as a requirements x products matrix.
+
+        Duplicate requirements are scored once, and requirements are processed in
+        blocks so the score matrix stays within BATCH_CELL_BUDGET cells.
+        A limit of 0 or less returns no matches.
+        """
+        unique_specs = list(dict.fromkeys(specs_list))
+        if not self.products or limit <= 0:
+            return [[] for _ in specs_list]
+
+        block_size = max(1, BATCH_CELL_BUDGET // len(self.products))
+        by_spec = {}
+        for start in range(0, len(unique_specs), block_size):
+            block = unique_specs[start:start + block_size]
+            by_spec.update(zip(block, self._score_block(block, limit)))
+        return [by_spec[spec] for spec in specs_list]
+
+    def top_matches(self, req_specs: RequirementSpec, limit: int = 3) -> List[MatchResult]:
+        """Top matches by spec match percentage, ties broken by lower price, then SKU"""
+        return self.top_matches_batch([req_specs], limit)[0]
@@ -0,0 +1,127 @@
+"""
+BM25 full-text index over the OEM catalog for search_product_catalog.
+Products are tokenized once from their normalized search text (SKU, name,
+category and spec values); queries only touch the postings of their own tokens.
+"""
+import heapq
+import math
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from backend.core.catalog_fields import NormalizedProduct
+from backend.core.postings import CopyOnWritePostings
+
+# Numbers (incl. decimals like 1.1 or 3.5) and words are separate tokens, so
+# "3C" and "1.1kV" index as "3" "c" and "1.1" "kv"
+_TOKEN_RE = re.compile(r"\d+(?:\.\d+)?|[a-z]+")
+
+# Default number of results returned by search_product_catalog
+SEARCH_RESULT_LIMIT = int(os.getenv("SEARCH_RESULT_LIMIT", "10"))
+
+# Standard BM25 parameters: term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _term_frequencies(product: NormalizedProduct) -> Tuple[Dict[str, int], int]:
+    tf: Dict[str, int] = {}
+    tokens = _TOKEN_RE.findall(product.search_text)
+    for token in tokens:
+        tf[token] = tf.get(token, 0) + 1
+    return tf, len(tokens)
+
+
+class CatalogSearchIndex:
+    """Inverted index token -> {doc id: term frequency}, patched in place on catalog mutations.
+
+    Doc ids grow monotonically and follow catalog order at build time, so they
+    double as a stable tie-break for equally scored products.
+    """
+
+    def __init__(self, products: List[NormalizedProduct]):
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: Dict[int, int] = {}
+        self.docs: Dict[int, NormalizedProduct] = {}
+        self.sku_docs: Dict[str, int] = {}
+        self.total_length = 0
+        self._next_doc = 0
+        for product in products:
+            self._add(product, self.postings)
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _add(self, product: NormalizedProduct, postings: Dict[str, Dict[int, int]]) -> None:
+        doc = self._next_doc
+        self._next_doc += 1
+        tf, length = _term_frequencies(product)
+        for token, count in tf.items():
+            postings.setdefault(token, {})[doc] = count
+        self.doc_lengths[doc] = length
+        self.docs[doc] = product
+        self.sku_docs.setdefault(product.sku, doc)
+        self.total_length += length
+
+    def _remove(self, product: NormalizedProduct, postings: Dict[str, Dict[int, int]]) -> None:
+        doc = self.sku_docs.pop(product.sku, None)
+        if doc is None:
+            return
+        tf, _ = _term_frequencies(self.docs[doc])
+        for token in tf:
+            postings[token].pop(doc, None)
+        self.total_length -= self.doc_lengths.pop(doc)
+        del self.docs[doc]
+
+    def apply_changes(self, changes) -> None:
+        """Patch the index with (old, new) normalized record pairs from the catalog store"""
+        # Copy each touched posting once and swap it in at the end, so queries
+        # running concurrently never iterate a dict that is changing size
+        touched = CopyOnWritePostings(self.postings, dict)
+        for old, new in changes:
+            if old is not None:
+                self._remove(old, touched)
+            if new is not None:
+                self._add(new, touched)
+        touched.publish()
+
+    def search(self, query: str, limit: Optional[int] = SEARCH_RESULT_LIMIT) -> List[Tuple[dict, float]]:
+        """Top products for `query` as (product, score), best first; limit=None returns all hits"""
+        tokens = set(tokenize(query))
+        n_docs = len(self.doc_lengths)
+        if not tokens or not n_docs:
+            return []
+
+        avg_length = self.total_length / n_docs or 1.0
+        terms = []
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting:
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                terms.append((idf, posting))
+        # Rarest terms first. Once the current k-th best score beats everything the
+        # remaining (common) terms could add, no new document can reach the top k,
+        # so those terms only update existing candidates instead of scanning postings
+        terms.sort(key=lambda term: term[0], reverse=True)
+        remaining_bound = sum(idf for idf, _ in terms) * (BM25_K1 + 1)
+
+        scores: Dict[int, float] = {}
+        for idf, posting in terms:
+            if limit is not None and len(scores) >= limit and \
+                    heapq.nlargest(limit, scores.values())[-1] > remaining_bound:
+                docs = [(doc, posting[doc]) for doc in scores if doc in posting]
+            else:
+                docs = posting.items()
+            for doc, tf in docs:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths.get(doc, avg_length) / avg_length)
+                scores[doc] = scores.get(doc, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+            remaining_bound -= idf * (BM25_K1 + 1)
+
+        ranked = ((score, -doc) for doc, score in scores.items())
+        top = heapq.nlargest(limit, ranked) if limit is not None else sorted(ranked, reverse=True)
+        docs = self.docs
+        return [(docs[-neg_doc].record, score) for score, neg_doc in top if -neg_doc in docs]
@@ -0,0 +1,68 @@
+"""
+Standards compliance bitsets over catalog row ids.
+Each standard maps to a Python int with bit `row` set for every product listing
+it, so "products meeting all required standards" is one AND across a few ints.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from backend.core.catalog_fields import NormalizedProduct
+
+
+def standard_met(product_standard: str, required: str) -> bool:
+    """Whether a product's (canonical) standard satisfies a required one.
+
+    A requirement without a part number is met by any part of that standard:
+    'is 7098' is met by 'is 7098 part 1'.
+    """
+    return product_standard == required or product_standard.startswith(required + " ")
+
+
+def meets_standards(product_standards: Iterable[str], required: Tuple[str, ...]) -> Tuple[int, int]:
+    """(required standards met, required standards) for one product"""
+    product_standards = tuple(product_standards)
+    met = sum(1 for r in required if any(standard_met(s, r) for s in product_standards))
+    return met, len(required)
+
+
+class StandardsIndex:
+    """Standard -> bitset of catalog rows listing it, built once per catalog snapshot"""
+
+    def __init__(self, products: List[NormalizedProduct]):
+        self.size = len(products)
+        self.bits: Dict[str, int] = {}
+        for row, product in enumerate(products):
+            for standard in product.standards:
+                self.bits[standard] = self.bits.get(standard, 0) | (1 << row)
+        self._required: Dict[str, int] = {}
+
+    def rows_meeting(self, required: str) -> int:
+        """Bitset of rows meeting one required standard (any listed part counts for a part-less requirement)"""
+        mask = self._required.get(required)
+        if mask is None:
+            mask = 0
+            for standard, bits in self.bits.items():
+                if standard_met(standard, required):
+                    mask |= bits
+            self._required[required] = mask
+        return mask
+
+    def compliant(self, required: Tuple[str, ...]) -> int:
+        """Bitset of rows meeting every required standard"""
+        mask = (1 << self.size) - 1
+        for standard in required:
+            mask &= self.rows_meeting(standard)
+            if not mask:
+                break
+        return mask
+
+    def partially_compliant(self, required: Tuple[str, ...]) -> int:
+        """Bitset of rows meeting at least one required standard"""
+        mask = 0
+        for standard in required:
+            mask |= self.rows_meeting(standard)
+        return mask
+
+
+def bitset_rows(mask: int) -> List[int]:
+    """Row ids set in a bitset, ascending"""
+    return [row for row, bit in enumerate(reversed(bin(mask)[2:])) if bit == "1"]
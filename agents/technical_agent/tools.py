@@ -1,58 +1,75 @@
 from langchain.tools import tool
 from typing import List, Dict
+import dataclasses
 import os
 import json
-import re
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from requirement_parser import parse_requirement, required_standards
+from technical_agent.alternatives import ALTERNATIVES_FILE, AlternativesGraph
+from technical_agent.matcher import CatalogMatcher
+from technical_agent.parallel import get_parallel_matcher
+from technical_agent.scoring import MatchResult
+from technical_agent.search_index import CatalogSearchIndex, SEARCH_RESULT_LIMIT
+from backend.core.catalog_store import catalog_store
+from backend.core.match_cache import match_result_cache
+from backend.core.sku_lookup import TrigramIndex
+
+# Matches returned per requirement unless a caller asks for more (e.g. top-10 alternatives)
+MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", "3"))
 
 
 def load_oem_catalog():
-    catalog_path = os.path.join(os.path.dirname(__file__), '../../data/catalog.json')
-    global OEM_PRODUCT_CATALOG
-    if os.path.exists(catalog_path):
-        with open(catalog_path, 'r') as f:
-            OEM_PRODUCT_CATALOG = json.load(f)
-            return OEM_PRODUCT_CATALOG
-    OEM_PRODUCT_CATALOG = []
-    return OEM_PRODUCT_CATALOG
+    """Current catalog products from the shared store (loaded from data/catalog.json on first use)"""
+    return catalog_store.products()
+
+
+def get_catalog_matcher() -> CatalogMatcher:
+    """Matcher for the current catalog version, rebuilt only after the catalog changes"""
+    return catalog_store.derived("matcher", CatalogMatcher)
+
 
+def get_search_index() -> CatalogSearchIndex:
+    """Full-text index kept in step with catalog edits"""
+    return catalog_store.derived("search", CatalogSearchIndex)
 
-OEM_PRODUCT_CATALOG = load_oem_catalog()
+
+def get_sku_lookup() -> TrigramIndex:
+    """Typo-tolerant SKU/name index kept in step with catalog edits"""
+    return catalog_store.derived("sku_lookup", TrigramIndex)
+
+
+def get_alternatives_graph() -> AlternativesGraph:
+    """Substitute-product graph, loaded (and patched to the catalog) from next to catalog.json.
+    Built at backend startup; alternatives.json is its only stored copy, so it stays out of catalog.snapshot."""
+    path = os.path.join(os.path.dirname(catalog_store.path), ALTERNATIVES_FILE)
+    return catalog_store.derived(
+        "alternatives",
+        lambda products: AlternativesGraph.load_or_build(products, path, matcher=get_catalog_matcher()),
+        persist=False,
+    )
 
 
 @tool("search_product_catalog")
-def search_product_catalog(query: str) -> str:
+def search_product_catalog(query: str, limit: int = SEARCH_RESULT_LIMIT) -> str:
     """
-    Search the OEM product catalog for matching products.
-    Input: Search query (e.g., 'XLPE 3C 120 sqmm' or 'control cable 16 core')
+    Search the OEM product catalog for matching products, best matches first.
+    Input: Search query (e.g., 'XLPE 3C 120 sqmm' or 'control cable 16 core'),
+           limit - maximum number of products to return (default 10)
     """
-    query_lower = query.lower()
-    matches = []
-    
-    for product in OEM_PRODUCT_CATALOG:
-        name_match = query_lower in product["name"].lower()
-        category_match = query_lower in product["category"].lower()
-        
-        specs_match = False
-        for key, value in product["specs"].items():
-            if isinstance(value, str) and query_lower in value.lower():
-                specs_match = True
-            elif isinstance(value, list):
-                for v in value:
-                    if query_lower in str(v).lower():
-                        specs_match = True
-        
-        if name_match or category_match or specs_match:
-            matches.append(product)
+    matches = get_search_index().search(query, limit)
     
     if not matches:
         return f"No products found matching '{query}'"
     
-    result = f"Found {len(matches)} products matching '{query}':\n\n"
-    for p in matches:
+    result = f"Found {len(matches)} products matching '{query}' (ranked by relevance):\n\n"
+    for p, score in matches:
         result += f"**SKU: {p['sku']}**\n"
         result += f"- Name: {p['name']}\n"
         result += f"- Category: {p['category']}\n"
         result += f"- Base Price: ₹{p['base_price_per_meter']}/m\n"
+        result += f"- Relevance: {score:.2f}\n"
         result += f"- Key Specs: {json.dumps(p['specs'], indent=2)}\n\n"
     
     return result
@@ -64,9 +81,13 @@ def get_product_details(sku: str) -> str:
     Get detailed specifications for a specific product SKU.
     Input: Product SKU (e.g., 'PWR-XLPE-3C120-1.1')
     """
-    product = next((p for p in OEM_PRODUCT_CATALOG if p["sku"] == sku), None)
+    product = catalog_store.get(sku)
     
     if not product:
+        suggestions = get_sku_lookup().lookup(sku, limit=3)
+        if suggestions:
+            return f"Product with SKU '{sku}' not found. Did you mean: " + \
+                ", ".join(f"{p['sku']} ({p['name']})" for p, _ in suggestions) + "?"
         return f"Product with SKU '{sku}' not found."
     
     result = f"# Product Details: {product['sku']}\n\n"
@@ -81,200 +102,133 @@ def get_product_details(sku: str) -> str:
         else:
             result += f"- **{key.replace('_', ' ').title()}:** {value}\n"
     
+    alternatives = get_alternatives_graph().alternatives(product["sku"], limit=3)
+    if alternatives:
+        result += "\n## Alternatives\n"
+        for alt, match_percent in alternatives:
+            result += f"- **{alt.sku}** ({alt.record['name']}): {match_percent:.0f}% spec match, ₹{alt.price_per_meter}/m\n"
+    
+    return result
+
+
+@tool("find_alternative_products")
+def find_alternative_products(sku: str, limit: int = 5) -> str:
+    """
+    List substitute products for a SKU (e.g. when the top match is out of stock or scores too low).
+    Alternatives are precomputed with the same 8-parameter spec match used for RFP requirements.
+    Input: sku - Product SKU (e.g., 'PWR-XLPE-3C120-1.1'),
+           limit - maximum number of alternatives (default 5)
+    """
+    if catalog_store.get(sku) is None:
+        return f"Product with SKU '{sku}' not found. Use lookup_product to find the closest SKU."
+    
+    alternatives = get_alternatives_graph().alternatives(sku, limit)
+    if not alternatives:
+        return f"No alternatives found for {sku}"
+    
+    result = f"## Alternatives for: {sku}\n\n"
+    result += "| Rank | SKU | Product Name | Spec Match | Price/m |\n"
+    result += "|------|-----|--------------|------------|---------|\n"
+    for i, (alt, match_percent) in enumerate(alternatives, 1):
+        result += f"| {i} | {alt.sku} | {alt.record['name']} | {match_percent:.0f}% | ₹{alt.price_per_meter} |\n"
+    
+    return result
+
+
+@tool("lookup_product")
+def lookup_product(query: str, limit: int = 5) -> str:
+    """
+    Find the closest catalog SKUs for a possibly misspelled SKU or product name.
+    Use this when an exact SKU is not found instead of retrying variations.
+    Input: query - SKU or product name as written in the tender (e.g., 'PWR XLPE 3C-120 1.1'),
+           limit - maximum number of candidates (default 5)
+    """
+    candidates = get_sku_lookup().lookup(query, limit)
+    
+    if not candidates:
+        return f"No catalog products resemble '{query}'"
+    
+    result = f"## Closest catalog products for: {query}\n\n"
+    result += "| SKU | Product Name | Similarity |\n"
+    result += "|-----|--------------|------------|\n"
+    for p, similarity in candidates:
+        result += f"| {p['sku']} | {p['name']} | {similarity:.0%} |\n"
+    
     return result
 
 
 @tool("match_rfp_requirement_to_products")
-def match_rfp_requirement_to_products(rfp_requirement: str) -> str:
+def match_rfp_requirement_to_products(rfp_requirement: str, top_k: int = MATCH_TOP_K, standards: str = "") -> str:
     """
-    Match a single RFP product requirement to top 3 OEM products with spec match percentage.
-    Uses 8-parameter equal-weight scoring: voltage, conductor, size, cores, insulation, armour, cable_type, application.
-    Input: RFP requirement description (e.g., '1.1 kV XLPE Power Cable - 3C x 120 sqmm')
+    Match a single RFP product requirement to the top OEM products (3 by default) with spec match percentage.
+    Uses 8-parameter weighted scoring (equal weights unless MATCH_WEIGHTS is set): voltage, conductor, size, cores,
+    insulation, armour, cable_type, application, plus standards compliance when standards are given.
+    Input: rfp_requirement - RFP requirement description (e.g., '1.1 kV XLPE Power Cable - 3C x 120 sqmm'),
+           top_k - number of products to return (e.g., 10 to list alternatives),
+           standards - comma-separated standards from the RFP's technical specs (e.g., 'IS 7098 Part 1, IEC 60502-1')
     """
-    req_lower = rfp_requirement.lower()
-    matches = []
-    
-    # Extract required specs from requirement string
-    req_specs = {
-        "voltage": None,
-        "insulation": None,
-        "cores": None,
-        "size": None,
-        "conductor": None,
-        "armour": None,
-        "cable_type": None,
-        "application": None
-    }
-    
-    # Voltage extraction
-    if "11 kv" in req_lower or "11kv" in req_lower:
-        req_specs["voltage"] = "11 kV"
-    elif "1.1 kv" in req_lower or "1.1kv" in req_lower:
-        req_specs["voltage"] = "1.1 kV"
-    elif "450/750" in req_lower:
-        req_specs["voltage"] = "450/750 V"
-    elif "300/500" in req_lower:
-        req_specs["voltage"] = "300/500 V"
-    
-    # Insulation extraction
-    for ins in ["xlpe", "pvc", "fr-lsh", "rubber", "pe"]:
-        if ins in req_lower:
-            req_specs["insulation"] = ins.upper()
-    
-    # Cores extraction
-    core_match = re.search(r'(\d+(?:\.\d+)?)\s*c(?:ore)?', req_lower)
-    if core_match:
-        cores_val = core_match.group(1)
-        if '.' in cores_val:
-            req_specs["cores"] = float(cores_val)
+    top_matches = match_requirements_batch([rfp_requirement], top_k, standards)[0]
+    return format_match_table(rfp_requirement, top_matches, closest_available_sizes(rfp_requirement), top_k)
+
+
+def match_requirements_batch(requirements: List[str], top_k: int = MATCH_TOP_K,
+                             standards=None) -> List[List[MatchResult]]:
+    """Helper to match a whole scope of supply in one pass; returns top_k matches per requirement, in input order.
+
+    standards (a list or comma-separated string, usually the RFP's technical_specs.standards)
+    applies to every requirement and adds the standards compliance criterion.
+    """
+    if top_k <= 0:
+        return [[] for _ in requirements]
+    specs_list = [parse_requirement(req) for req in requirements]
+    standards = required_standards(standards)
+    if standards:
+        specs_list = [dataclasses.replace(req_specs, standards=standards) for req_specs in specs_list]
+    snapshot = catalog_store.snapshot()
+    version = snapshot.version
+    
+    results = {}
+    for req_specs in specs_list:
+        if req_specs not in results:
+            results[req_specs] = match_result_cache.get(req_specs, top_k, version)
+    
+    missing = [req_specs for req_specs, cached in results.items() if cached is None]
+    if missing:
+        catalog_matcher = get_catalog_matcher()
+        parallel_matcher = get_parallel_matcher(snapshot.normalized)
+        if parallel_matcher is not None:
+            scored = parallel_matcher.match_batch(missing, top_k, serial=catalog_matcher)
         else:
-            req_specs["cores"] = int(cores_val)
-    
-    # Size extraction
-    size_match = re.search(r'(\d+(?:\.\d+)?)\s*sqmm', req_lower)
-    if size_match:
-        req_specs["size"] = float(size_match.group(1))
-    
-    # Conductor extraction
-    if "copper" in req_lower:
-        req_specs["conductor"] = "copper"
-    elif "aluminium" in req_lower or "aluminum" in req_lower:
-        req_specs["conductor"] = "aluminium"
-    
-    # Armour extraction
-    if "armour" in req_lower or "armored" in req_lower:
-        req_specs["armour"] = True
-    
-    # Cable type extraction
-    if "power" in req_lower:
-        req_specs["cable_type"] = "power"
-    elif "control" in req_lower:
-        req_specs["cable_type"] = "control"
-    elif "instrumentation" in req_lower:
-        req_specs["cable_type"] = "instrumentation"
-    elif "flexible" in req_lower:
-        req_specs["cable_type"] = "flexible"
-    
-    # Application extraction
-    if "underground" in req_lower:
-        req_specs["application"] = "underground"
-    elif "overhead" in req_lower:
-        req_specs["application"] = "overhead"
-    
-    # Score each product (8 parameters, equal weight)
-    for product in OEM_PRODUCT_CATALOG:
-        score = 0
-        total_criteria = 0
-        match_details = []
-        specs = product["specs"]
-        
-        # 1. Voltage (1/8 = 12.5%)
-        if req_specs["voltage"]:
-            total_criteria += 1
-            if specs.get("voltage_grade") == req_specs["voltage"]:
-                score += 1
-                match_details.append("✓ Voltage")
-            else:
-                match_details.append("✗ Voltage")
-        
-        # 2. Insulation (1/8 = 12.5%)
-        if req_specs["insulation"]:
-            total_criteria += 1
-            if req_specs["insulation"].lower() in specs.get("insulation", "").lower():
-                score += 1
-                match_details.append("✓ Insulation")
-            else:
-                match_details.append("✗ Insulation")
-        
-        # 3. Cores (1/8 = 12.5%)
-        if req_specs["cores"]:
-            total_criteria += 1
-            product_cores = specs.get("cores", 0)
-            if product_cores == req_specs["cores"]:
-                score += 1
-                match_details.append("✓ Cores")
-            elif product_cores and abs(product_cores - req_specs["cores"]) <= 2:
-                score += 0.5
-                match_details.append("~ Cores (close)")
-            else:
-                match_details.append("✗ Cores")
-        
-        # 4. Size (1/8 = 12.5%)
-        if req_specs["size"]:
-            total_criteria += 1
-            product_size = specs.get("conductor_size_sqmm", 0)
-            if product_size == req_specs["size"]:
-                score += 1
-                match_details.append("✓ Size")
-            elif product_size and abs(product_size - req_specs["size"]) / req_specs["size"] <= 0.25:
-                score += 0.5
-                match_details.append("~ Size (close)")
-            else:
-                match_details.append("✗ Size")
-        
-        # 5. Conductor (1/8 = 12.5%)
-        if req_specs["conductor"]:
-            total_criteria += 1
-            if req_specs["conductor"].lower() in specs.get("conductor_material", "").lower():
-                score += 1
-                match_details.append("✓ Conductor")
-            else:
-                match_details.append("✗ Conductor")
-        
-        # 6. Armour (1/8 = 12.5%)
-        if req_specs["armour"]:
-            total_criteria += 1
-            if "armour" in specs or "armored" in product["category"].lower():
-                score += 1
-                match_details.append("✓ Armour")
-            else:
-                match_details.append("✗ Armour")
-        
-        # 7. Cable Type (1/8 = 12.5%)
-        if req_specs["cable_type"]:
-            total_criteria += 1
-            if req_specs["cable_type"].lower() in product["category"].lower():
-                score += 1
-                match_details.append("✓ Cable Type")
-            else:
-                match_details.append("✗ Cable Type")
-        
-        # 8. Application (1/8 = 12.5%)
-        if req_specs["application"]:
-            total_criteria += 1
-            if specs.get("application") and req_specs["application"].lower() in specs.get("application", "").lower():
-                score += 1
-                match_details.append("✓ Application")
-            else:
-                match_details.append("✗ Application")
-        
-        # Calculate percentage
-        if total_criteria > 0:
-            match_percent = (score / total_criteria) * 100
-            if match_percent > 0:
-                matches.append({
-                    "sku": product["sku"],
-                    "name": product["name"],
-                    "match_percent": match_percent,
-                    "match_details": match_details,
-                    "price": product["base_price_per_meter"],
-                    "specs": specs
-                })
-    
-    # Sort and get top 3
-    matches.sort(key=lambda x: x["match_percent"], reverse=True)
-    top_matches = matches[:3]
+            scored = catalog_matcher.match_batch(missing, top_k)
+        for req_specs, matches in zip(missing, scored):
+            results[req_specs] = matches
+            match_result_cache.put(req_specs, top_k, version, matches)
     
+    return [list(results[req_specs]) for req_specs in specs_list]
+
+
+def closest_available_sizes(rfp_requirement: str) -> List[float]:
+    """Helper to find the nearest stocked conductor sizes when the requested size is not in the catalog"""
+    return get_catalog_matcher().size_alternatives(parse_requirement(rfp_requirement))
+
+
+def format_match_table(rfp_requirement: str, top_matches: List[MatchResult], closest_sizes: List[float] = None,
+                       top_k: int = MATCH_TOP_K) -> str:
+    """Helper to render top matches as the markdown table shown to users and the LLM"""
     if not top_matches:
         return f"No matching products found for: {rfp_requirement}"
     
-    result = f"## Top 3 OEM Product Matches for: {rfp_requirement}\n\n"
+    result = f"## Top {top_k} OEM Product Matches for: {rfp_requirement}\n\n"
     result += "| Rank | SKU | Product Name | Spec Match | Price/m | Match Details |\n"
     result += "|------|-----|--------------|------------|---------|---------------|\n"
     
     for i, m in enumerate(top_matches, 1):
-        details = ", ".join(m["match_details"])
-        result += f"| {i} | {m['sku']} | {m['name']} | {m['match_percent']:.0f}% | ₹{m['price']} | {details} |\n"
+        details = ", ".join(m.match_details)
+        result += f"| {i} | {m.sku} | {m.name} | {m.match_percent:.0f}% | ₹{m.price} | {details} |\n"
+    
+    if closest_sizes:
+        sizes = ", ".join(f"{size:g} sqmm" for size in closest_sizes)
+        result += f"\n**Requested size not in catalog.** Closest available sizes: {sizes}\n"
     
     return result
 
@@ -287,7 +241,7 @@ def generate_product_comparison_table(rfp_requirement: str, sku_list: str) -> st
            sku_list - comma-separated list of SKUs to compare (e.g., 'SKU1,SKU2,SKU3')
     """
     skus = [s.strip() for s in sku_list.split(",")]
-    products = [p for p in OEM_PRODUCT_CATALOG if p["sku"] in skus]
+    products = catalog_store.get_many(skus)
     
     if not products:
         return "No valid SKUs provided for comparison."
@@ -331,13 +285,13 @@ def list_all_products() -> str:
     result += "| SKU | Product Name | Category | Base Price |\n"
     result += "|-----|--------------|----------|------------|\n"
     
-    for p in OEM_PRODUCT_CATALOG:
+    for p in catalog_store.products():
         result += f"| {p['sku']} | {p['name']} | {p['category']} | ₹{p['base_price_per_meter']}/m |\n"
     
     return result
 
 
-def build_technical_prompt(rfp_data: dict, top_matches: List[dict]) -> str:
+def build_technical_prompt(rfp_data: dict, top_matches: List[MatchResult]) -> str:
     """Helper to build technical analysis prompt"""
     prompt = f"# Technical Analysis for RFP: {rfp_data.get('id', 'N/A')}\n\n"
     prompt += f"**Project:** {rfp_data.get('title', 'N/A')}\n"
@@ -345,8 +299,8 @@ def build_technical_prompt(rfp_data: dict, top_matches: List[dict]) -> str:
     
     prompt += "## Product Matches Found:\n\n"
     for i, match in enumerate(top_matches, 1):
-        prompt += f"{i}. **{match['sku']}** - {match['name']}\n"
-        prompt += f"   - Match Score: {match['match_percent']:.0f}%\n"
-        prompt += f"   - Price: ₹{match['price']}/meter\n\n"
+        prompt += f"{i}. **{match.sku}** - {match.name}\n"
+        prompt += f"   - Match Score: {match.match_percent:.0f}%\n"
+        prompt += f"   - Price: ₹{match.price}/meter\n\n"
     
     return prompt
@@ -4,7 +4,8 @@ import json
 from datetime import datetime
 
 from ..models import OEMProduct
-from ..core.config import oem_catalog_db
+from ..core.catalog_store import catalog_store
+from ..core.sku_lookup import TrigramIndex
 from ..utils import save_catalog
 
 router = APIRouter(prefix="/api/catalog", tags=["catalog"])
@@ -16,9 +17,9 @@ async def get_catalog(
     category: Optional[str] = Query(None, description="Filter by category")
 ):
     """Get paginated OEM products from catalog with optional category filter"""
-    filtered = oem_catalog_db
+    filtered = catalog_store.products()
     if category:
-        filtered = [p for p in oem_catalog_db if p.get("category", "").lower() == category.lower()]
+        filtered = [p for p in filtered if p.get("category", "").lower() == category.lower()]
 
     total = len(filtered)
     start = (page - 1) * size
@@ -35,31 +36,61 @@ async def get_catalog(
         },
     }
 
+@router.get("/lookup")
+async def lookup_product(
+    q: str = Query(..., min_length=1, description="SKU or product name, typos allowed"),
+    limit: int = Query(5, ge=1, le=50, description="Maximum number of candidates")
+):
+    """Nearest catalog products to a possibly misspelled SKU or name, with similarity scores"""
+    candidates = catalog_store.derived("sku_lookup", TrigramIndex).lookup(q, limit)
+    return {
+        "query": q,
+        "results": [
+            {"sku": p["sku"], "name": p.get("name"), "similarity": round(similarity, 4)}
+            for p, similarity in candidates
+        ],
+    }
+
+@router.get("/match")
+async def match_requirement(
+    requirement: str = Query(..., min_length=1, description="RFP line item, e.g. '1.1 kV XLPE Power Cable - 3C x 120 sqmm'"),
+    top_k: int = Query(3, ge=1, le=50, description="Number of matching products to return"),
+    standards: Optional[str] = Query(None, description="Comma-separated required standards, e.g. 'IS 7098 Part 1,IEC 60502-1'")
+):
+    """Top-k catalog products for an RFP requirement, ranked by spec match and standards compliance"""
+    from agents.technical_agent.tools import match_requirements_batch
+
+    matches = match_requirements_batch([requirement], top_k, standards)[0]
+    return {
+        "requirement": requirement,
+        "top_k": top_k,
+        "standards": standards,
+        "matches": [m.to_dict() for m in matches],
+    }
+
 @router.post("", response_model=OEMProduct)
 async def add_product(product: OEMProduct):
     """Add new product to catalog"""
-    # Check if SKU already exists
-    if any(p['sku'] == product.sku for p in oem_catalog_db):
-        raise HTTPException(status_code=400, detail="SKU already exists")
-
     product_dict = product.dict()
     product_dict['created_at'] = datetime.now().isoformat()
     product_dict['updated_at'] = datetime.now().isoformat()
 
-    oem_catalog_db.append(product_dict)
-    save_catalog(oem_catalog_db)
+    if not catalog_store.add(product_dict):
+        raise HTTPException(status_code=400, detail="SKU already exists")
+
+    save_catalog(catalog_store.products())
     return product_dict
 
 @router.put("/{sku}", response_model=OEMProduct)
 async def update_product(sku: str, product: OEMProduct):
     """Update existing product"""
-    for i, p in enumerate(oem_catalog_db):
-        if p['sku'] == sku:
-            product_dict = product.dict()
-            product_dict['updated_at'] = datetime.now().isoformat()
-            product_dict['created_at'] = p.get('created_at', datetime.now().isoformat())
-            oem_catalog_db[i] = product_dict
-            save_catalog(oem_catalog_db)
+    existing = catalog_store.get(sku)
+    if existing is not None:
+        product_dict = product.dict()
+        product_dict['updated_at'] = datetime.now().isoformat()
+        product_dict['created_at'] = existing.get('created_at', datetime.now().isoformat())
+        if catalog_store.update(sku, product_dict):
+            save_catalog(catalog_store.products())
             return product_dict
 
     raise HTTPException(status_code=404, detail="Product not found")
@@ -67,11 +98,9 @@ async def update_product(sku: str, product: OEMProduct):
 @router.delete("/{sku}")
 async def delete_product(sku: str):
     """Delete product from catalog"""
-    for i, p in enumerate(oem_catalog_db):
-        if p['sku'] == sku:
-            oem_catalog_db.pop(i)
-            save_catalog(oem_catalog_db)
-            return {"message": "Product deleted successfully"}
+    if catalog_store.delete(sku):
+        save_catalog(catalog_store.products())
+        return {"message": "Product deleted successfully"}
 
     raise HTTPException(status_code=404, detail="Product not found")
 
@@ -90,18 +119,17 @@ async def upload_catalog(file: UploadFile = File(...)):
         else:
             raise HTTPException(status_code=400, detail="Unsupported file format")
 
-        # Add to catalog
+        # Add to catalog (existing SKUs are kept as-is)
         for product in new_products:
-            if not any(p['sku'] == product['sku'] for p in oem_catalog_db):
-                product['created_at'] = datetime.now().isoformat()
-                product['updated_at'] = datetime.now().isoformat()
-                oem_catalog_db.append(product)
+            product['created_at'] = datetime.now().isoformat()
+            product['updated_at'] = datetime.now().isoformat()
+        catalog_store.add_many(new_products)
 
-        save_catalog(oem_catalog_db)
+        save_catalog(catalog_store.products())
 
         return {
             "message": f"Successfully uploaded {len(new_products)} products",
-            "total_products": len(oem_catalog_db)
+            "total_products": len(catalog_store)
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,7 +1,9 @@
 from fastapi import APIRouter
 from datetime import datetime
 
-from ..core.config import oem_catalog_db, test_pricing_db
+from ..core.config import test_pricing_db
+from ..core.catalog_store import catalog_store
+from ..core.match_cache import match_result_cache
 
 router = APIRouter(tags=["misc"])
 
@@ -19,7 +21,7 @@ async def health_check():
     return {
         "status": "healthy",
         "agents": "LangGraph workflow active",
-        "catalog_items": len(oem_catalog_db),
+        "catalog_items": len(catalog_store),
         "test_types": len(test_pricing_db)
     }
 
@@ -47,8 +49,9 @@ async def analyze_rfp():
 async def get_dashboard_stats():
     """Get dashboard statistics"""
     return {
-        "total_products": len(oem_catalog_db),
+        "total_products": len(catalog_store),
         "test_types": len(test_pricing_db),
         "system_status": "operational",
+        "match_cache": match_result_cache.stats(),
         "last_updated": datetime.now().isoformat()
     }
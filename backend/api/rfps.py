@@ -1,9 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional
 
 from ..models import RFPEntry
-from ..core.config import rfps_db
-from ..utils import save_rfps
+from ..core import rfp_store
 
 router = APIRouter(prefix="/api/rfps", tags=["rfps"])
 
@@ -12,7 +11,7 @@ def _next_rfp_id() -> str:
     from datetime import datetime
     year = datetime.now().year
     max_num = 0
-    for r in rfps_db:
+    for r in rfp_store.rfps():
         if r.get("id", "").startswith(f"RFP-{year}-"):
             try:
                 num = int(r["id"].split("-")[-1])
@@ -22,17 +21,21 @@ def _next_rfp_id() -> str:
     return f"RFP-{year}-{max_num + 1:04d}"
 
 @router.get("", response_model=List[RFPEntry])
-async def get_rfps():
+async def get_rfps(
+    due_within: Optional[int] = Query(None, ge=0, description="Only RFPs due in the next N days, earliest first")
+):
     """Get all RFPs"""
-    return rfps_db
+    if due_within is not None:
+        return [record.raw for record in rfp_store.index().due_within(due_within)]
+    return rfp_store.rfps()
 
 @router.get("/{rfp_id}", response_model=RFPEntry)
 async def get_rfp(rfp_id: str):
     """Get a specific RFP by ID"""
-    for r in rfps_db:
-        if r.get("id") == rfp_id:
-            return r
-    raise HTTPException(status_code=404, detail="RFP not found")
+    rfp = rfp_store.get(rfp_id)
+    if rfp is None:
+        raise HTTPException(status_code=404, detail="RFP not found")
+    return rfp
 
 @router.post("", response_model=RFPEntry)
 async def create_rfp(rfp: RFPEntry):
@@ -42,30 +45,23 @@ async def create_rfp(rfp: RFPEntry):
         rfp_dict["id"] = _next_rfp_id()
     else:
         # Ensure no duplicate ID
-        if any(r.get("id") == rfp_dict["id"] for r in rfps_db):
+        if rfp_store.get(rfp_dict["id"]) is not None:
             raise HTTPException(status_code=400, detail="RFP ID already exists")
-    rfps_db.append(rfp_dict)
-    save_rfps(rfps_db)
-    return rfp_dict
+    return rfp_store.add(rfp_dict)
 
 @router.put("/{rfp_id}", response_model=RFPEntry)
 async def update_rfp(rfp_id: str, rfp: RFPEntry):
     """Update an existing RFP"""
-    for i, r in enumerate(rfps_db):
-        if r.get("id") == rfp_id:
-            rfp_dict = rfp.dict()
-            rfp_dict["id"] = rfp_id
-            rfps_db[i] = rfp_dict
-            save_rfps(rfps_db)
-            return rfp_dict
-    raise HTTPException(status_code=404, detail="RFP not found")
+    rfp_dict = rfp.dict()
+    rfp_dict["id"] = rfp_id
+    updated = rfp_store.replace(rfp_id, rfp_dict)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="RFP not found")
+    return updated
 
 @router.delete("/{rfp_id}")
 async def delete_rfp(rfp_id: str):
     """Delete an RFP"""
-    for i, r in enumerate(rfps_db):
-        if r.get("id") == rfp_id:
-            rfps_db.pop(i)
-            save_rfps(rfps_db)
-            return {"message": "RFP deleted", "rfp_id": rfp_id}
-    raise HTTPException(status_code=404, detail="RFP not found")
+    if not rfp_store.delete(rfp_id):
+        raise HTTPException(status_code=404, detail="RFP not found")
+    return {"message": "RFP deleted", "rfp_id": rfp_id}
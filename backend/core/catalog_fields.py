@@ -0,0 +1,86 @@
+"""
+Normalized companion records for catalog products.
+Built once per product when it enters the catalog store, so matching, search
+and pricing read pre-lowercased strings and parsed numbers instead of
+re-deriving them from the raw specs on every call.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from .units import parse_size_mm2, parse_voltage
+
+
+def _number(value) -> Optional[float]:
+    # Missing, zero and non-numeric values can never match or earn partial credit
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and value:
+        return value
+    return None
+
+
+_STANDARD_SEPARATORS_RE = re.compile(r"[\s:()\-]+")
+
+
+def _lower(value) -> str:
+    return value.lower() if isinstance(value, str) else ""
+
+
+def normalize_standard(text: str) -> str:
+    """Canonical standard reference: 'IS:7098 (Part-1)' and 'IS 7098 Part 1' -> 'is 7098 part 1'"""
+    return _STANDARD_SEPARATORS_RE.sub(" ", _lower(text)).strip()
+
+
+@dataclass(frozen=True)
+class NormalizedProduct:
+    """Pre-lowercased strings and parsed numbers for one catalog product"""
+    sku: str
+    name: str
+    category: str
+    # Rated voltage U in volts ('450/750 V' -> 750)
+    voltage_volts: Optional[int]
+    insulation: str
+    conductor: str
+    application: str
+    cores: Optional[float]
+    size: Optional[float]
+    armoured: bool
+    # Canonical references (see normalize_standard)
+    standards: Tuple[str, ...]
+    price_per_meter: float
+    # Lowercased SKU, name, category and spec values for full-text indexing
+    search_text: str
+    record: Dict[str, Any] = field(compare=False, repr=False)
+
+
+def normalize_product(product: Dict[str, Any]) -> NormalizedProduct:
+    specs = product.get("specs") or {}
+    category = _lower(product.get("category"))
+    voltage = parse_voltage(specs.get("voltage_grade"))
+    size = specs.get("conductor_size_sqmm")
+    standards = specs.get("standards") or []
+    if isinstance(standards, str):
+        standards = [standards]
+
+    text = [product.get("sku", ""), product.get("name", ""), product.get("category", "")]
+    for value in specs.values():
+        if isinstance(value, list):
+            text.extend(map(str, value))
+        elif value is not None:
+            text.append(str(value))
+
+    return NormalizedProduct(
+        sku=product["sku"],
+        name=_lower(product.get("name")),
+        category=category,
+        voltage_volts=voltage.rated if voltage else None,
+        insulation=_lower(specs.get("insulation")),
+        conductor=_lower(specs.get("conductor_material")),
+        application=_lower(specs.get("application")),
+        cores=_number(specs.get("cores")),
+        size=parse_size_mm2(size) if isinstance(size, str) else _number(size),
+        armoured="armour" in specs or "armored" in category,
+        standards=tuple(filter(None, (normalize_standard(s) for s in standards))),
+        price_per_meter=product.get("base_price_per_meter") or 0,
+        search_text=" ".join(text).lower(),
+        record=product,
+    )
@@ -0,0 +1,309 @@
+"""
+Shared in-memory OEM catalog store.
+Owns the catalog records, their normalized companion records, the SKU index
+and any derived indexes (e.g. the technical agent's matcher), all tied to one
+atomic version counter. The API
+routers write through it and every agent tool reads from it, so catalog.json
+is parsed once and edits are visible to the agents immediately. Derived
+structures are also snapshotted to disk, keyed by the catalog's content hash
+and the source of the code that built them, so later process starts skip the
+rebuild.
+"""
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .catalog_fields import NormalizedProduct, normalize_product
+from .index_snapshot import (
+    StoredIndex, code_fingerprint, content_hash, dump_index, load_index, read_snapshot, write_snapshot,
+)
+
+# (old, new) normalized record per mutated product; None on one side for inserts/deletes
+CatalogChange = Tuple[Optional[NormalizedProduct], Optional[NormalizedProduct]]
+
+logger = logging.getLogger(__name__)
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "catalog.json")
+# Warm-start snapshot of the store and its derived indexes, written next to the catalog (0 disables)
+CATALOG_SNAPSHOT = os.getenv("CATALOG_SNAPSHOT", "1") == "1"
+SNAPSHOT_SUFFIX = ".snapshot"
+# Modules that define the snapshotted store records; editing one invalidates the snapshot
+SNAPSHOT_MODULES = (__name__, NormalizedProduct.__module__)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """Consistent read-only view of the catalog at one version"""
+    version: int
+    products: List[Dict[str, Any]]
+    # Companion records, aligned with products
+    normalized: List[NormalizedProduct]
+    by_sku: Dict[str, Dict[str, Any]]
+    positions: Dict[str, int]
+
+
+def _with_catalog_fields(product: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill agent-side catalog keys for records created through the API (OEMProduct schema)"""
+    product = dict(product)
+    product.setdefault("name", product.get("product_name", product.get("sku", "")))
+    product.setdefault("specs", product.get("specifications") or {})
+    product.setdefault("category", "Cables")
+    if "base_price_per_meter" not in product and product.get("price_per_km") is not None:
+        product["base_price_per_meter"] = product["price_per_km"] / 1000
+    return product
+
+
+class CatalogStore:
+    """Copy-on-write catalog: writers publish a new snapshot, readers never see a partial update"""
+
+    def __init__(self, path: str = CATALOG_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._snapshot = CatalogSnapshot(version=0, products=[], normalized=[], by_sku={}, positions={})
+        self._loaded = False
+        self._derived: Dict[str, Any] = {}
+        # Content hash of the catalog file and the version that still matches it (None after edits)
+        self._file_hash: Optional[bytes] = None
+        self._file_version: Optional[int] = None
+        # Pickled derived indexes for the file version, restored on first use
+        self._stored_indexes: Dict[str, StoredIndex] = {}
+        # Per-index locks, so an index is built once without holding the store lock
+        self._build_locks: Dict[str, threading.Lock] = {}
+        # Snapshot files are pickled and written by one background thread; the latest queued state wins
+        self._snapshot_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="catalog-snapshot")
+        self._pending_snapshot: Optional[tuple] = None
+        self._pending_lock = threading.Lock()
+
+    def _publish(self, products: List[Dict[str, Any]], normalized: List[NormalizedProduct],
+                 by_sku: Dict[str, Dict[str, Any]], positions: Dict[str, int],
+                 changes: Optional[List[CatalogChange]] = None) -> CatalogSnapshot:
+        """Swap in a new snapshot; derived indexes with apply_changes() follow it, the rest are dropped"""
+        previous = self._snapshot.version
+        self._snapshot = CatalogSnapshot(previous + 1, products, normalized, by_sku, positions)
+        derived = {}
+        if changes is not None:
+            for name, (version, value) in self._derived.items():
+                if version == previous and hasattr(value, "apply_changes"):
+                    value.apply_changes(changes)
+                    derived[name] = (self._snapshot.version, value)
+        self._derived = derived
+        return self._snapshot
+
+    def _replace_all(self, products: List[Dict[str, Any]]) -> CatalogSnapshot:
+        """Publish a whole new product list, indexing the first record of each SKU"""
+        by_sku, positions = {}, {}
+        for i, product in enumerate(products):
+            if product["sku"] not in by_sku:
+                by_sku[product["sku"]] = product
+                positions[product["sku"]] = i
+        return self._publish(products, [normalize_product(p) for p in products], by_sku, positions)
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.splitext(self.path)[0] + SNAPSHOT_SUFFIX
+
+    def load(self, path: Optional[str] = None, force: bool = False) -> CatalogSnapshot:
+        """Parse catalog.json once; later calls are no-ops unless force=True.
+
+        When a snapshot for the same file content exists, the records, SKU maps
+        and any derived indexes stored with it are loaded instead of rebuilt.
+        """
+        with self._lock:
+            if self._loaded and not force:
+                return self._snapshot
+            self.path = path or self.path
+            self._loaded = True
+            self._file_hash = self._file_version = None
+            self._stored_indexes = {}
+            if not os.path.exists(self.path):
+                return self._replace_all([])
+
+            with open(self.path, "rb") as f:
+                data = f.read()
+            digest = content_hash(data)
+            code = code_fingerprint(SNAPSHOT_MODULES)
+            stored = read_snapshot(self.snapshot_path, digest, code) if CATALOG_SNAPSHOT else None
+            if stored is not None:
+                snapshot = self._publish(stored["products"], stored["normalized"], stored["by_sku"], stored["positions"])
+                self._stored_indexes = stored["indexes"]
+                logger.info(f"Loaded {len(snapshot.products)} catalog products and "
+                            f"{len(self._stored_indexes)} indexes from {self.snapshot_path}")
+            else:
+                snapshot = self._replace_all(json.loads(data))
+                logger.info(f"Loaded {len(snapshot.products)} catalog products from {self.path}")
+            self._file_hash, self._file_version = digest, snapshot.version
+            if stored is None:
+                self._write_snapshot()
+            return snapshot
+
+    def _write_snapshot(self) -> None:
+        """Queue a write of the current snapshot and its derived indexes while they still match the catalog file"""
+        with self._lock:
+            if not CATALOG_SNAPSHOT or self._file_version != self._snapshot.version:
+                return
+            state = (self.snapshot_path, self._file_hash, self._snapshot, dict(self._stored_indexes))
+        with self._pending_lock:
+            scheduled = self._pending_snapshot is not None
+            self._pending_snapshot = state
+        if not scheduled:
+            self._snapshot_writer.submit(self._flush_snapshot)
+
+    def _flush_snapshot(self) -> None:
+        with self._pending_lock:
+            (path, digest, snapshot, indexes), self._pending_snapshot = self._pending_snapshot, None
+        write_snapshot(path, digest, code_fingerprint(SNAPSHOT_MODULES), {
+            "products": snapshot.products,
+            "normalized": snapshot.normalized,
+            "by_sku": snapshot.by_sku,
+            "positions": snapshot.positions,
+            "indexes": indexes,
+        })
+
+    def snapshot(self) -> CatalogSnapshot:
+        if not self._loaded:
+            self.load()
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self.snapshot().version
+
+    def products(self) -> List[Dict[str, Any]]:
+        return self.snapshot().products
+
+    def get(self, sku: str) -> Optional[Dict[str, Any]]:
+        """O(1) lookup by SKU"""
+        return self.snapshot().by_sku.get(sku)
+
+    def get_many(self, skus: List[str]) -> List[Dict[str, Any]]:
+        """Products for the known SKUs among `skus`, in catalog order, without duplicates"""
+        snapshot = self.snapshot()
+        found = sorted({sku for sku in skus if sku in snapshot.positions}, key=snapshot.positions.__getitem__)
+        return [snapshot.by_sku[sku] for sku in found]
+
+    def __len__(self) -> int:
+        return len(self.snapshot().products)
+
+    def normalized(self, sku: str) -> Optional[NormalizedProduct]:
+        """Companion record for a SKU"""
+        snapshot = self.snapshot()
+        i = snapshot.positions.get(sku)
+        return snapshot.normalized[i] if i is not None else None
+
+    def derived(self, name: str, builder: Callable[[List[NormalizedProduct]], Any], persist: bool = True) -> Any:
+        """Index built from the current snapshot's normalized records, at most once per version.
+
+        Indexes exposing apply_changes(changes) are patched on mutation instead
+        of being rebuilt from scratch. While the catalog still matches its file,
+        indexes are restored from (and added to) the on-disk snapshot, unless
+        persist=False (for indexes that store themselves).
+
+        The builder runs outside the store lock, so catalog writes and other
+        indexes never wait behind a slow build; its result is only installed
+        if no write published a new version meanwhile.
+        """
+        snapshot = self.snapshot()
+        entry = self._derived.get(name)
+        if entry is not None and entry[0] == snapshot.version:
+            return entry[1]
+        with self._lock:
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+        with build_lock:
+            with self._lock:
+                snapshot = self._snapshot
+                entry = self._derived.get(name)
+                if entry is not None and entry[0] == snapshot.version:
+                    return entry[1]
+                from_file = snapshot.version == self._file_version
+                if not persist:
+                    self._stored_indexes.pop(name, None)
+                stored = self._stored_indexes.get(name) if persist and from_file else None
+
+            value = load_index(stored, snapshot.normalized, snapshot.products) if stored is not None else None
+            dumped = None
+            if value is None:
+                value = builder(snapshot.normalized)
+                if persist and from_file and CATALOG_SNAPSHOT:
+                    dumped = dump_index(value, snapshot.normalized, snapshot.products)
+
+            with self._lock:
+                if self._snapshot.version != snapshot.version:
+                    return value
+                self._derived[name] = (snapshot.version, value)
+                if dumped is not None:
+                    self._stored_indexes[name] = dumped
+            if dumped is not None:
+                self._write_snapshot()
+            return value
+
+    def add(self, product: Dict[str, Any]) -> bool:
+        """Add a product; False if the SKU already exists"""
+        return self.add_many([product]) == 1
+
+    def add_many(self, products: List[Dict[str, Any]]) -> int:
+        """Add every product whose SKU is new, as one version bump; returns the number added"""
+        with self._lock:
+            snapshot = self.snapshot()
+            by_sku, positions = dict(snapshot.by_sku), dict(snapshot.positions)
+            new_products, new_normalized = [], []
+            for product in products:
+                if product["sku"] not in by_sku:
+                    product = _with_catalog_fields(product)
+                    by_sku[product["sku"]] = product
+                    positions[product["sku"]] = len(snapshot.products) + len(new_products)
+                    new_products.append(product)
+                    new_normalized.append(normalize_product(product))
+            if new_products:
+                self._publish(snapshot.products + new_products, snapshot.normalized + new_normalized,
+                              by_sku, positions, [(None, record) for record in new_normalized])
+            return len(new_products)
+
+    def update(self, sku: str, product: Dict[str, Any]) -> bool:
+        """Replace the product with this SKU in place; False if not found"""
+        with self._lock:
+            snapshot = self.snapshot()
+            i = snapshot.positions.get(sku)
+            if i is None:
+                return False
+            product = _with_catalog_fields(product)
+            products, by_sku, positions = list(snapshot.products), dict(snapshot.by_sku), dict(snapshot.positions)
+            normalized = list(snapshot.normalized)
+            products[i] = product
+            normalized[i] = normalize_product(product)
+            del by_sku[sku], positions[sku]
+            if product["sku"] in by_sku or len(snapshot.positions) != len(snapshot.products):
+                # Duplicate SKUs involved: rebuild so the first record of each SKU keeps the entry
+                self._replace_all(products)
+                return True
+            by_sku[product["sku"]] = product
+            positions[product["sku"]] = i
+            self._publish(products, normalized, by_sku, positions, [(snapshot.normalized[i], normalized[i])])
+            return True
+
+    def delete(self, sku: str) -> bool:
+        """Remove the product with this SKU; False if not found"""
+        with self._lock:
+            snapshot = self.snapshot()
+            i = snapshot.positions.get(sku)
+            if i is None:
+                return False
+            products = snapshot.products[:i] + snapshot.products[i + 1:]
+            if len(snapshot.positions) != len(snapshot.products):
+                # Duplicate SKUs in the catalog file: a later duplicate may now take over the entry
+                self._replace_all(products)
+                return True
+            by_sku, positions = dict(snapshot.by_sku), dict(snapshot.positions)
+            del by_sku[sku], positions[sku]
+            for product in products[i:]:
+                positions[product["sku"]] -= 1
+            normalized = snapshot.normalized[:i] + snapshot.normalized[i + 1:]
+            self._publish(products, normalized, by_sku, positions, [(snapshot.normalized[i], None)])
+            return True
+
+
+# Global catalog store instance
+catalog_store = CatalogStore()
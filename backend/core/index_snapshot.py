@@ -0,0 +1,163 @@
+"""
+Versioned binary snapshots of catalog-derived structures.
+A snapshot file is a fixed header (magic, format version, SHA-256 of the
+catalog.json bytes it was built from, fingerprint of the code that shaped the
+payload) followed by a pickle payload, so a worker can check the header
+without reading the payload and warm-start from it when neither the catalog
+nor that code has changed.
+
+Derived indexes are pickled one by one, with catalog records written as row
+references, so each index is restored lazily by whoever first asks for it
+(its module may not be importable when the store loads) and shares the
+store's records instead of carrying copies. Each index also records the
+source hash of every project module whose objects it pickled, and is rebuilt
+when one of those modules has changed.
+"""
+import hashlib
+import importlib
+import io
+import logging
+import os
+import pickle
+import struct
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the snapshot file layout itself changes; code changes are caught by the fingerprints
+SNAPSHOT_FORMAT = 2
+
+_MAGIC = b"RFPCIDX\0"
+_HEADER = struct.Struct("<8sH32s32s")
+
+# Modules under the repository root are fingerprinted; library objects are left to unpickling
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def content_hash(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()
+
+
+@lru_cache(maxsize=None)
+def module_fingerprint(name: str) -> Optional[str]:
+    """SHA-256 of a project module's source, or None for modules outside the project"""
+    try:
+        path = importlib.import_module(name).__file__
+    except Exception:
+        return None
+    if not path or not os.path.abspath(path).startswith(_PROJECT_ROOT + os.sep):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def code_fingerprint(modules: Iterable[str]) -> bytes:
+    """Combined source hash of the given modules, for the snapshot header"""
+    digest = hashlib.sha256()
+    for name in sorted(set(modules)):
+        digest.update(f"{name}={module_fingerprint(name)}\n".encode())
+    return digest.digest()
+
+
+def read_snapshot(path: str, expected_hash: bytes, code: bytes) -> Optional[Dict[str, Any]]:
+    """Payload stored at `path` if it was written by this format for `expected_hash` and `code`, else None"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None
+            magic, version, digest, code_digest = _HEADER.unpack(header)
+            if magic != _MAGIC or version != SNAPSHOT_FORMAT or digest != expected_hash or code_digest != code:
+                return None
+            # Only files this service wrote into its own data directory are unpickled
+            return pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable index snapshot {path}: {e}")
+        return None
+
+
+def write_snapshot(path: str, digest: bytes, code: bytes, payload: Dict[str, Any]) -> bool:
+    """Atomically write a snapshot; False (and a warning) if the file system refuses"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, SNAPSHOT_FORMAT, digest, code))
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        logger.warning(f"Could not write index snapshot {path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+class StoredIndex(NamedTuple):
+    """A pickled derived index and the source hash of each project module it was pickled with"""
+    blob: bytes
+    modules: Dict[str, str]
+
+
+class _RowPickler(pickle.Pickler):
+    """Writes the normalized list, its records and the raw product dicts as row references,
+    noting the module of every class it pickles (instances pickle their class by reference)"""
+
+    def __init__(self, file, normalized: List[Any], products: List[Dict[str, Any]]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.refs = {id(normalized): ("normalized", None)}
+        self.refs.update((id(record), ("record", row)) for row, record in enumerate(normalized))
+        self.refs.update((id(product), ("product", row)) for row, product in enumerate(products))
+        self.modules = set()
+
+    def persistent_id(self, obj):
+        return self.refs.get(id(obj))
+
+    def reducer_override(self, obj):
+        # Not called for plain containers and scalars, so this stays off the hot path
+        if isinstance(obj, type):
+            self.modules.add(obj.__module__)
+        return NotImplemented
+
+
+class _RowUnpickler(pickle.Unpickler):
+    def __init__(self, file, normalized: List[Any], products: List[Dict[str, Any]]):
+        super().__init__(file)
+        self.normalized = normalized
+        self.products = products
+
+    def persistent_load(self, ref):
+        kind, row = ref
+        if kind == "normalized":
+            return self.normalized
+        return self.normalized[row] if kind == "record" else self.products[row]
+
+
+def dump_index(value: Any, normalized: List[Any], products: List[Dict[str, Any]]) -> Optional[StoredIndex]:
+    """Pickle one derived index against the snapshot's rows; None if it cannot be pickled"""
+    buffer = io.BytesIO()
+    pickler = _RowPickler(buffer, normalized, products)
+    try:
+        pickler.dump(value)
+    except Exception as e:
+        logger.warning(f"Derived index {type(value).__name__} is not snapshotted: {e}")
+        return None
+    modules = {name: module_fingerprint(name) for name in pickler.modules}
+    return StoredIndex(buffer.getvalue(), {name: digest for name, digest in modules.items() if digest})
+
+
+def load_index(stored: StoredIndex, normalized: List[Any], products: List[Dict[str, Any]]) -> Optional[Any]:
+    """Restore a derived index pickled by dump_index; None if its code changed or its classes are missing"""
+    changed = [name for name, digest in stored.modules.items() if module_fingerprint(name) != digest]
+    if changed:
+        logger.info(f"Rebuilding derived index: {', '.join(sorted(changed))} changed since it was snapshotted")
+        return None
+    try:
+        return _RowUnpickler(io.BytesIO(stored.blob), normalized, products).load()
+    except Exception as e:
+        logger.warning(f"Ignoring stale derived index in snapshot: {e}")
+        return None
@@ -1,21 +1,36 @@
 import json
+import logging
 import os
-from .config import oem_catalog_db, test_pricing_db, rfps_db, REPORTS_DIR
+import threading
+from .config import test_pricing_db, REPORTS_DIR
+from . import rfp_store
+from .catalog_store import catalog_store
+
+logger = logging.getLogger(__name__)
 
 def load_initial_data():
     """Load initial data on startup"""
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
 
-    if os.path.exists('data/catalog.json'):
-        with open('data/catalog.json', 'r') as f:
-            oem_catalog_db.extend(json.load(f))
+    catalog_store.load()
 
     if os.path.exists('data/test_pricing.json'):
         with open('data/test_pricing.json', 'r') as f:
             test_pricing_db.update(json.load(f))
 
-    if os.path.exists('data/rfps.json'):
-        with open('data/rfps.json', 'r') as f:
-            rfps_db.extend(json.load(f))
+    rfp_store.load()
 
     print("✅ RFP Automation System initialized (LangGraph)")
+
+
+def warm_agent_indexes():
+    """Build the technical agent's substitute-product graph in the background at startup,
+    so no tool call pays for it (O(n²) for a catalog without a usable data/alternatives.json)"""
+    def build():
+        try:
+            from agents.technical_agent.tools import get_alternatives_graph
+            get_alternatives_graph()
+        except Exception as e:
+            logger.warning(f"Alternatives graph not prebuilt, it will be built on first use: {e}")
+
+    threading.Thread(target=build, name="alternatives-warmup", daemon=True).start()
@@ -0,0 +1,103 @@
+"""
+Versioned cache of top-k spec match results.
+Entries are keyed by (parsed requirement, top_k, catalog version), so any
+catalog mutation makes previous results unreachable; they are purged on the
+next access. Eviction is LRU, bounded by entry count and estimated memory.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+MATCH_CACHE_MAX_ENTRIES = int(os.getenv("MATCH_CACHE_MAX_ENTRIES", "10000"))
+MATCH_CACHE_MAX_BYTES = int(os.getenv("MATCH_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def _estimate_size(key: Hashable, results: List[Any]) -> int:
+    """Rough size of one entry; product specs are shared with the catalog and not counted"""
+    size = sys.getsizeof(key) + sys.getsizeof(results)
+    for result in results:
+        size += sys.getsizeof(result) + sys.getsizeof(getattr(result, "__dict__", {}))
+        size += sys.getsizeof(getattr(result, "sku", "")) + sys.getsizeof(getattr(result, "name", ""))
+    return size
+
+
+class MatchResultCache:
+    """Thread-safe LRU of match results for the current catalog version"""
+
+    def __init__(self, max_entries: int = MATCH_CACHE_MAX_ENTRIES, max_bytes: int = MATCH_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[Hashable, int], Tuple[List[Any], int]]" = OrderedDict()
+        self._version: Optional[int] = None
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _sync_version(self, version: int) -> bool:
+        """Purge entries from older catalog versions; False if the caller's version is already stale"""
+        if self._version is not None and version < self._version:
+            return False
+        if version != self._version:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+        return True
+
+    def get(self, requirement: Hashable, top_k: int, version: int) -> Optional[List[Any]]:
+        with self._lock:
+            entry = self._entries.get((requirement, top_k)) if self._sync_version(version) else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((requirement, top_k))
+            self.hits += 1
+            return list(entry[0])
+
+    def put(self, requirement: Hashable, top_k: int, version: int, results: List[Any]) -> None:
+        key = (requirement, top_k)
+        size = _estimate_size(requirement, results)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if not self._sync_version(version):
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (list(results), size)
+            self._bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the dashboard"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "estimated_bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "catalog_version": self._version,
+            }
+
+
+# Global match result cache instance
+match_result_cache = MatchResultCache()
@@ -0,0 +1,31 @@
+"""
+Copy-on-write patching of inverted-index postings shared by the SKU trigram
+lookup and the technical agent's catalog search index.
+Readers keep iterating the published postings while a batch of catalog edits
+is applied to private copies, which are swapped in one key at a time.
+"""
+from typing import Any, Callable, Dict
+
+
+class CopyOnWritePostings(dict):
+    """Overlay over `base` that copies a key's posting (with `factory`, e.g. set or dict) the first time it is touched"""
+
+    def __init__(self, base: Dict[Any, Any], factory: Callable[[Any], Any]):
+        super().__init__()
+        self.base = base
+        self.factory = factory
+
+    def __missing__(self, key):
+        posting = self[key] = self.factory(self.base.get(key, ()))
+        return posting
+
+    def setdefault(self, key, default=None):
+        return self[key]
+
+    def publish(self) -> None:
+        """Swap every touched posting into `base`, dropping the ones left empty"""
+        for key, posting in self.items():
+            if posting:
+                self.base[key] = posting
+            else:
+                self.base.pop(key, None)
@@ -0,0 +1,85 @@
+"""
+Deadline-sorted RFP index.
+Keeps (deadline, id) keys in a sorted list so "due in the next N days" is two
+bisects plus the k matching records, instead of a walk over every tender.
+The shared instance is kept in step with the RFP list by backend.core.rfp_store
+and read by both the API and the sales agent.
+"""
+import threading
+from bisect import bisect_left, insort
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .rfp_records import RFPRecord
+
+
+class DeadlineIndex:
+    """RFP records by id, plus their deadlines in sorted order (undated RFPs are tracked separately)"""
+
+    def __init__(self, records: Iterable[RFPRecord] = ()):
+        self._records: Dict[str, RFPRecord] = {}
+        self._keys: List[Tuple[date, str]] = []
+        self._undated: Set[str] = set()
+        # Written by API handlers and read by agent threads
+        self._lock = threading.RLock()
+        self.rebuild(records)
+
+    def rebuild(self, records: Iterable[RFPRecord]) -> None:
+        """Replace the contents; the first record of a duplicated id wins"""
+        by_id: Dict[str, RFPRecord] = {}
+        for record in records:
+            by_id.setdefault(record.id, record)
+        keys = sorted((r.deadline, r.id) for r in by_id.values() if r.deadline)
+        undated = {r.id for r in by_id.values() if not r.deadline}
+        with self._lock:
+            self._records, self._keys, self._undated = by_id, keys, undated
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def get(self, rfp_id: str) -> Optional[RFPRecord]:
+        return self._records.get(rfp_id)
+
+    def add(self, record: RFPRecord) -> None:
+        """Insert a record, replacing any record with the same id"""
+        with self._lock:
+            self.remove(record.id)
+            self._records[record.id] = record
+            if record.deadline:
+                insort(self._keys, (record.deadline, record.id))
+            else:
+                self._undated.add(record.id)
+
+    def remove(self, rfp_id: str) -> Optional[RFPRecord]:
+        with self._lock:
+            record = self._records.pop(rfp_id, None)
+            if record is None:
+                return None
+            if record.deadline:
+                del self._keys[bisect_left(self._keys, (record.deadline, rfp_id))]
+            else:
+                self._undated.discard(rfp_id)
+            return record
+
+    def due_between(self, start: date, end: date) -> List[RFPRecord]:
+        """Records with start <= deadline <= end, earliest deadline first (then id)"""
+        with self._lock:
+            lo = bisect_left(self._keys, (start, ""))
+            hi = len(self._keys) if end >= date.max else bisect_left(self._keys, (end + timedelta(days=1), ""), lo)
+            return [self._records[rfp_id] for _, rfp_id in self._keys[lo:hi]]
+
+    def due_within(self, days: int, today: Optional[date] = None) -> List[RFPRecord]:
+        """Records due between today and today + `days` (inclusive); windows past date.max end there"""
+        today = today or date.today()
+        if days < 0:
+            return []
+        end = date.max if days >= (date.max - today).days else today + timedelta(days=days)
+        return self.due_between(today, end)
+
+    def undated(self) -> List[RFPRecord]:
+        with self._lock:
+            return [self._records[rfp_id] for rfp_id in self._undated]
+
+
+# Global index over the API's RFP list, shared with the sales agent (see rfp_store)
+rfp_index = DeadlineIndex()
@@ -0,0 +1,87 @@
+"""
+Pre-parsed RFP records.
+Tender feeds carry deadlines as ISO date strings and values as display text
+("₹15 L", "₹2.5 Cr"). Each RFP is parsed once at ingestion into an RFPRecord,
+so the sales tools compare dates and integers instead of re-parsing strings.
+"""
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from .units import parse_inr, quantity_in_metres
+
+# Deadline formats seen on tender portals, tried after ISO 8601
+DEADLINE_FORMATS = ("%d-%b-%Y", "%d-%B-%Y", "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y", "%d %b %Y", "%d %B %Y", "%b %d, %Y", "%B %d, %Y")
+
+# Trailing time of day, e.g. "15-Mar-2026 03:00 PM"
+_TIME_SUFFIX_RE = re.compile(r"\s+\d{1,2}:\d{2}.*$")
+
+
+@dataclass(frozen=True)
+class ScopeItem:
+    """One scope-of-supply line with its quantity in metres (None if the quantity is not a length)"""
+    item: str
+    quantity: str
+    quantity_m: Optional[int]
+
+
+@dataclass(frozen=True)
+class RFPRecord:
+    """Typed view of one RFP; `raw` is the original record for display and API responses"""
+    id: str
+    title: str
+    client: str
+    location: str
+    deadline: Optional[date]
+    value_inr: Optional[int]
+    scope: Tuple[ScopeItem, ...]
+    raw: Dict[str, Any] = field(compare=False, repr=False)
+
+    def days_remaining(self, today: date) -> Optional[int]:
+        return (self.deadline - today).days if self.deadline else None
+
+
+def parse_deadline(text: Optional[str]) -> Optional[date]:
+    """'2026-03-15' or a portal format such as '15-Mar-2026 03:00 PM' -> date; None when missing or malformed"""
+    if not text:
+        return None
+    try:
+        return date.fromisoformat(text[:10])
+    except (TypeError, ValueError):
+        pass
+    return _parse_portal_date(text) if isinstance(text, str) else None
+
+
+@lru_cache(maxsize=1024)
+def _parse_portal_date(text: str) -> Optional[date]:
+    text = _TIME_SUFFIX_RE.sub("", text.strip())
+    for fmt in DEADLINE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_rfp(rfp: Dict[str, Any]) -> RFPRecord:
+    """Parse a scraped/sample RFP or an API RFPEntry (submission_date / value fields)"""
+    scope = tuple(
+        ScopeItem(
+            item=line.get("item", ""),
+            quantity=str(line.get("quantity", "")),
+            quantity_m=quantity_in_metres(line.get("quantity")),
+        )
+        for line in rfp.get("scope_of_supply") or []
+    )
+    return RFPRecord(
+        id=rfp.get("id") or rfp.get("rfp_id") or "",
+        title=rfp.get("title", ""),
+        client=rfp.get("client", ""),
+        location=rfp.get("location", ""),
+        deadline=parse_deadline(rfp.get("submission_deadline") or rfp.get("submission_date")),
+        value_inr=parse_inr(rfp.get("estimated_value") or rfp.get("value")),
+        scope=scope,
+        raw=rfp,
+    )
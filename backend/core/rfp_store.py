@@ -0,0 +1,133 @@
+"""
+RFP store shared by the API routers and the sales agent.
+rfps_db (persisted to data/rfps.json) holds the RFP dicts and rfp_index their
+deadline index over the same dict objects; every change goes through these
+helpers so the two never diverge. data/rfps.json is read on first access, so
+the agents work without the API's startup.
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .rfp_index import DeadlineIndex, rfp_index
+from .rfp_records import parse_rfp
+from ..utils import save_rfps
+
+# Sample/scraped RFPs and API entries (RFPEntry) name these fields differently; stored RFPs carry both
+FIELD_ALIASES = (("submission_deadline", "submission_date"), ("estimated_value", "value"))
+
+RFPS_FILE = os.path.normpath(os.path.join(os.path.dirname(__file__), "../../data/rfps.json"))
+
+rfps_db: List[Dict[str, Any]] = []
+_lock = threading.RLock()
+_loaded = False
+
+
+def with_aliases(rfp: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill each aliased field from its counterpart, so either consumer can read the RFP"""
+    for name, alias in FIELD_ALIASES:
+        if rfp.get(name) is None and rfp.get(alias) is not None:
+            rfp[name] = rfp[alias]
+        elif rfp.get(alias) is None and rfp.get(name) is not None:
+            rfp[alias] = rfp[name]
+    return rfp
+
+
+def load(path: str = RFPS_FILE, force: bool = False) -> None:
+    """Read the stored RFPs once; later calls are no-ops unless force=True"""
+    global _loaded
+    with _lock:
+        if _loaded and not force:
+            return
+        _loaded = True
+        rfps = []
+        if os.path.exists(path):
+            with open(path, "r") as f:
+                rfps = json.load(f)
+        rfps_db[:] = [with_aliases(rfp) for rfp in rfps]
+        rfp_index.rebuild(parse_rfp(rfp) for rfp in rfps_db)
+
+
+def rfps() -> List[Dict[str, Any]]:
+    """Every stored RFP dict, in insertion order"""
+    if not _loaded:
+        load()
+    return rfps_db
+
+
+def index() -> DeadlineIndex:
+    """Deadline index over the stored RFPs"""
+    if not _loaded:
+        load()
+    return rfp_index
+
+
+def get(rfp_id: str) -> Optional[Dict[str, Any]]:
+    record = index().get(rfp_id)
+    return record.raw if record else None
+
+
+def add(rfp: Dict[str, Any]) -> Dict[str, Any]:
+    with _lock:
+        load()
+        rfp = with_aliases(rfp)
+        rfps_db.append(rfp)
+        rfp_index.add(parse_rfp(rfp))
+        save_rfps(rfps_db)
+    return rfp
+
+
+def replace(rfp_id: str, rfp: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Swap in a new version of an RFP; None if the id is unknown"""
+    with _lock:
+        load()
+        for i, existing in enumerate(rfps_db):
+            if existing.get("id") == rfp_id:
+                rfps_db[i] = rfp = with_aliases(rfp)
+                rfp_index.add(parse_rfp(rfp))
+                save_rfps(rfps_db)
+                return rfp
+    return None
+
+
+def delete(rfp_id: str) -> bool:
+    with _lock:
+        load()
+        for i, existing in enumerate(rfps_db):
+            if existing.get("id") == rfp_id:
+                rfps_db.pop(i)
+                rfp_index.remove(rfp_id)
+                save_rfps(rfps_db)
+                return True
+    return False
+
+
+def upsert(rfps: Iterable[Dict[str, Any]], defaults: Optional[Dict[str, Any]] = None) -> Tuple[int, int]:
+    """Add new RFPs (over `defaults`) or merge fresh fields into stored ones, persisting once;
+    returns (added, updated). Merging keeps fields the incoming RFP lacks, e.g. scope_of_supply."""
+    added = updated = 0
+    with _lock:
+        load()
+        # First occurrence of each id, as rfp_index keeps it
+        positions: Dict[str, int] = {}
+        for i, existing in enumerate(rfps_db):
+            positions.setdefault(existing.get("id"), i)
+        for rfp in rfps:
+            incoming = with_aliases(dict(rfp))
+            existing = get(incoming["id"])
+            if existing is None:
+                stored = with_aliases({**(defaults or {}), **incoming})
+                positions[stored["id"]] = len(rfps_db)
+                rfps_db.append(stored)
+                added += 1
+            else:
+                stored = {**existing, **incoming}
+                if stored == existing:
+                    continue
+                rfps_db[positions[stored["id"]]] = stored
+                updated += 1
+            rfp_index.add(parse_rfp(stored))
+        if added or updated:
+            save_rfps(rfps_db)
+    return added, updated
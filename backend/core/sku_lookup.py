@@ -0,0 +1,130 @@
+"""
+Character-trigram index for typo-tolerant SKU and product name lookup.
+Used by the technical agent's lookup tool and the /api/catalog/lookup endpoint
+so near-miss SKUs pasted from tender PDFs resolve in one call.
+"""
+import heapq
+import re
+from typing import Dict, FrozenSet, List, Set, Tuple
+
+from .catalog_fields import NormalizedProduct
+from .postings import CopyOnWritePostings
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+# Candidates below this similarity share only a couple of incidental trigrams
+MIN_SIMILARITY = 0.3
+
+# Trigrams found in more than this share of entries ("cab", "ble", "sqm") only
+# re-rank candidates found through rarer trigrams instead of adding new ones;
+# postings shorter than COMMON_TRIGRAM_MIN are always cheap enough to scan
+COMMON_TRIGRAM_SHARE = 0.05
+COMMON_TRIGRAM_MIN = 1000
+
+
+def normalize_key(text: str) -> str:
+    """Lowercase and drop spacing/punctuation so 'PWR XLPE-3C 120' ~ 'PWR-XLPE-3C120'"""
+    return _NON_ALNUM_RE.sub("", (text or "").lower())
+
+
+def trigrams(text: str) -> Set[str]:
+    key = normalize_key(text)
+    if not key:
+        return set()
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Trigram -> entry ids, with one entry per product SKU and one per product name"""
+
+    def __init__(self, products: List[NormalizedProduct]):
+        self.postings: Dict[str, Set[int]] = {}
+        self.entries: Dict[int, Tuple[str, FrozenSet[str]]] = {}  # entry id -> (sku, trigrams)
+        self.products: Dict[str, dict] = {}
+        self.sku_entries: Dict[str, List[Tuple[int, str]]] = {}
+        self._next_entry = 0
+        for product in products:
+            self._add(product, self.postings)
+
+    def _add(self, product: NormalizedProduct, postings: Dict[str, Set[int]]) -> None:
+        sku = product.sku
+        if sku in self.products:
+            return
+        self.products[sku] = product.record
+        indexed = []
+        for text in (sku, product.name):
+            grams = trigrams(text)
+            if not grams:
+                continue
+            entry = self._next_entry
+            self._next_entry += 1
+            for gram in grams:
+                postings.setdefault(gram, set()).add(entry)
+            self.entries[entry] = (sku, frozenset(grams))
+            indexed.append((entry, text))
+        self.sku_entries[sku] = indexed
+
+    def _remove(self, product: NormalizedProduct, postings: Dict[str, Set[int]]) -> None:
+        sku = product.sku
+        if self.products.pop(sku, None) is None:
+            return
+        for entry, text in self.sku_entries.pop(sku):
+            for gram in trigrams(text):
+                postings[gram].discard(entry)
+            del self.entries[entry]
+
+    def apply_changes(self, changes) -> None:
+        """Patch the index with (old, new) normalized record pairs from the catalog store"""
+        # Copy touched postings once and swap them in, so concurrent lookups never see a set mutate
+        touched = CopyOnWritePostings(self.postings, set)
+        for old, new in changes:
+            if old is not None:
+                self._remove(old, touched)
+            if new is not None:
+                self._add(new, touched)
+        touched.publish()
+
+    def lookup(self, query: str, limit: int = 5) -> List[Tuple[dict, float]]:
+        """Closest products to `query` by Dice similarity of trigram sets, best first.
+
+        Postings are visited rarest first and each newly seen entry is scored
+        exactly. An entry not seen after m postings shares at most len(grams) - m
+        trigrams with the query, which caps its similarity; once that cap drops
+        below the k-th best score (or MIN_SIMILARITY) the remaining postings are
+        skipped. Common trigrams never introduce new candidates once rarer ones
+        have produced some, since an entry sharing only those is a weak match.
+        """
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        postings = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+        entries = self.entries
+        common = max(COMMON_TRIGRAM_SHARE * len(entries), COMMON_TRIGRAM_MIN)
+        seen: Set[int] = set()
+        best: Dict[str, float] = {}
+        for visited, posting in enumerate(postings):
+            unseen_shared = len(grams) - visited
+            cap = 2 * unseen_shared / (len(grams) + unseen_shared)
+            if cap < MIN_SIMILARITY:
+                break
+            if len(best) >= limit and heapq.nlargest(limit, best.values())[-1] > cap:
+                break
+            if best and len(posting) > common:
+                break
+            for entry in posting:
+                if entry in seen:
+                    continue
+                seen.add(entry)
+                info = entries.get(entry)
+                if info is None:
+                    continue
+                sku, entry_grams = info
+                similarity = 2 * len(grams & entry_grams) / (len(grams) + len(entry_grams))
+                if similarity > best.get(sku, 0.0):
+                    best[sku] = similarity
+
+        top = heapq.nsmallest(limit, ((-sim, sku) for sku, sim in best.items() if sim >= MIN_SIMILARITY))
+        products = self.products
+        return [(products[sku], -neg_sim) for neg_sim, sku in top if sku in products]
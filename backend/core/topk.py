@@ -0,0 +1,30 @@
+"""
+Bounded top-k selection shared by product matching and RFP prioritization.
+Keeps a heap of k items instead of sorting every candidate: O(n log k).
+"""
+import heapq
+from typing import Any, Callable, Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def top_k(items: Iterable[T], k: Optional[int], score: Callable[[T], Any],
+          tie_break: Optional[Callable[[T], Any]] = None) -> List[T]:
+    """The k highest-scoring items, best first.
+
+    Equal scores are ordered by tie_break ascending (e.g. lower price, then
+    SKU) and then by input order, so results are deterministic. k=None
+    returns every item in that order.
+    """
+    if tie_break is None:
+        # heapq.nlargest keeps input order among equal keys
+        if k is None:
+            return sorted(items, key=score, reverse=True)
+        return heapq.nlargest(k, items, key=score)
+
+    def rank(item: T):
+        return -score(item), tie_break(item)
+
+    if k is None:
+        return sorted(items, key=rank)
+    return heapq.nsmallest(k, items, key=rank)
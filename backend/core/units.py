@@ -0,0 +1,156 @@
+"""
+Unit normalization for cable specs and tender quantities.
+Voltages become volt ranges, conductor sizes mm², quantities metres and tender
+values rupees, so matching, pricing and prioritization compare numbers instead
+of free-text variants. Each parser is cached per distinct input string.
+"""
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional, Union
+
+# Tender feeds reuse a small set of spellings, so a few thousand entries per parser suffice
+UNIT_CACHE_SIZE = 4096
+
+# "1.1 kV", "11kv", "450/750 V", "0.6/1 kV", "6.35/11 kV (E)", bare "450/750"
+_VOLTAGE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:/\s*(\d+(?:\.\d+)?))?\s*(kv|v)\b")
+_VOLTAGE_PAIR_RE = re.compile(r"(?<![\d.])(\d{2,3})\s*/\s*(\d{3,4})(?![\d.])")
+
+# "120 sqmm", "120 sq mm", "120 sq.mm", "120 mm²", "120 mm2"
+_SIZE_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(?:sq\.?\s*mm|mm²|mm2)")
+# "3C x 1.5", "4 core x 16", "3.5C x 95" without a unit
+_CORES_BY_SIZE_RE = re.compile(r"\d+(?:\.\d+)?\s*c(?:ore)?s?\s*x\s*(\d+(?:\.\d+)?)")
+
+_NUMBER = r"(\d+(?:,\d{2,3})*(?:\.\d+)?)"
+_LENGTH_UNIT = r"(km|kms|kilomet(?:er|re)s?|m|mtrs?|met(?:er|re)s?|rm|rmt)"
+_TIMES = r"\s*[x×*]\s*"
+# Between a count of items and each item's length: "of", "x", "@", "each (of)", "(each ...", ", each ..."
+_PER_ITEM = r"\s*[(,]?\s*(?:of|x|×|\*|@|each(?:\s+of)?)?\s*"
+# "2 drums of 500 m", "3 coils x 1000 m", "6 drums (each 1000 m)"
+_DRUMS_RE = re.compile(_NUMBER + r"\s*(?:drums?|coils?|reels?)" + _PER_ITEM + _NUMBER + r"\s*" + _LENGTH_UNIT + r"?\b")
+# "3 x 500 m", "4 runs x 250 m", "4 lengths of 250m"
+_COUNT_TIMES_LENGTH_RE = re.compile(
+    _NUMBER + r"(?:\s*(?:nos?\.?|runs?|lengths?)" + _PER_ITEM + r"|" + _TIMES + r")" + _NUMBER + r"\s*" + _LENGTH_UNIT + r"\b"
+)
+# "500 m x 4 runs", "500 m x 4"
+_LENGTH_TIMES_COUNT_RE = re.compile(_NUMBER + r"\s*" + _LENGTH_UNIT + _TIMES + _NUMBER + r"(?![\d.])")
+# "5,000 m", "5 km", "2.5 kms", "8000 meters"
+_LENGTH_RE = re.compile(_NUMBER + r"\s*" + _LENGTH_UNIT + r"\b")
+# "5000" on its own
+_BARE_NUMBER_RE = re.compile(r"\s*" + _NUMBER + r"\s*")
+
+# "₹15 L", "₹2.5 Cr", "Rs. 85 lakhs", "INR 1,20,00,000"
+_INR_RE = re.compile(_NUMBER + r"\s*(crores?|cr|lakhs?|lacs?|l)?\b")
+_INR_MULTIPLIERS = {"cr": 10_000_000, "crore": 10_000_000, "crores": 10_000_000,
+                    "l": 100_000, "lakh": 100_000, "lakhs": 100_000, "lac": 100_000, "lacs": 100_000}
+
+
+class VoltageRange(NamedTuple):
+    """Voltage grade in volts: Uo/U pairs keep both ends, single ratings have low == high"""
+    low: int
+    high: int
+
+    @property
+    def rated(self) -> int:
+        """Rated (phase-to-phase) voltage U used to compare grades"""
+        return self.high
+
+    def label(self) -> str:
+        """Canonical grade text, e.g. '1.1 kV' or '450/750 V'"""
+        if self.high >= 1000:
+            values = [f"{v / 1000:g}" for v in (self.low, self.high)]
+            unit = "kV"
+        else:
+            values = [f"{v:g}" for v in (self.low, self.high)]
+            unit = "V"
+        text = values[1] if self.low == self.high else "/".join(values)
+        return f"{text} {unit}"
+
+
+def _volts(value: str, unit: str) -> int:
+    return round(float(value) * (1000 if unit == "kv" else 1))
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def parse_voltage(text: Optional[str]) -> Optional[VoltageRange]:
+    """First voltage expression in `text` as a VoltageRange, or None"""
+    if not text:
+        return None
+    lowered = text.lower()
+    match = _VOLTAGE_RE.search(lowered)
+    if match:
+        low, high, unit = match.groups()
+        high = high or low
+        return VoltageRange(_volts(low, unit), _volts(high, unit))
+    # Uo/U grades are often written without a unit ("450/750 grade")
+    match = _VOLTAGE_PAIR_RE.search(lowered)
+    if match:
+        return VoltageRange(int(match.group(1)), int(match.group(2)))
+    return None
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def parse_size_mm2(text: Optional[str]) -> Optional[float]:
+    """Conductor cross-section in mm² from '120 sqmm', '120 mm²' or a '3C x 120' core/size pair"""
+    if not text:
+        return None
+    lowered = text.lower()
+    match = _SIZE_RE.search(lowered) or _CORES_BY_SIZE_RE.search(lowered)
+    return float(match.group(1)) if match else None
+
+
+def _number(value: str) -> float:
+    return float(value.replace(",", ""))
+
+
+def _metres(length: str, unit: Optional[str]) -> float:
+    return _number(length) * (1000 if unit and unit.startswith("k") else 1)
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def parse_quantity_m(text: Optional[str]) -> Optional[int]:
+    """Cable length in whole metres from '5,000 m', '5 km', '2 drums of 500 m', '6 drums (each 1000 m)',
+    '4 lengths of 250m', '3 x 500 m' or '500 m x 4 runs'.
+
+    A bare number is metres only when it is the whole text; None for other
+    units ('10 Nos', '1 lot') or text without a length.
+    """
+    if not text:
+        return None
+    lowered = text.lower()
+    match = _DRUMS_RE.search(lowered) or _COUNT_TIMES_LENGTH_RE.search(lowered)
+    if match:
+        count, length, unit = match.groups()
+        return round(_number(count) * _metres(length, unit))
+    match = _LENGTH_TIMES_COUNT_RE.search(lowered)
+    if match:
+        length, unit, count = match.groups()
+        return round(_metres(length, unit) * _number(count))
+    match = _LENGTH_RE.search(lowered)
+    if match:
+        return round(_metres(*match.groups()))
+    match = _BARE_NUMBER_RE.fullmatch(lowered)
+    if match:
+        return round(_number(match.group(1)))
+    return None
+
+
+def quantity_in_metres(value: Union[int, float, str, None], default: Optional[int] = None) -> Optional[int]:
+    """Quantity from structured data (numbers are already metres) or tender text"""
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, (int, float)):
+        return round(value)
+    parsed = parse_quantity_m(value if isinstance(value, str) else None)
+    return parsed if parsed is not None else default
+
+
+@lru_cache(maxsize=UNIT_CACHE_SIZE)
+def parse_inr(text: Optional[str]) -> Optional[int]:
+    """Tender value in whole rupees from '₹15 L', '₹2.5 Cr' or 'Rs. 1,20,000'; None if no amount is given"""
+    if not text:
+        return None
+    match = _INR_RE.search(text.lower())
+    if not match:
+        return None
+    amount, unit = match.groups()
+    return round(_number(amount) * _INR_MULTIPLIERS.get(unit, 1))
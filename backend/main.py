@@ -10,7 +10,7 @@ Provides REST APIs for:
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .core.loader import load_initial_data
+from .core.loader import load_initial_data, warm_agent_indexes
 from .api import catalog, test_pricing, rfps, chat, reports, misc
 
 # Initialize FastAPI app
@@ -41,3 +41,4 @@ app.include_router(misc.router)
 @app.on_event("startup")
 async def startup_event():
     load_initial_data()
+    warm_agent_indexes()
@@ -1,7 +1,13 @@
 from langchain.tools import tool
 from typing import List, Dict, Any
 import json
-import re
+import os
+import sys
+
+# Share the requirement parser (and the backend unit parsers it uses) with the LangGraph agents
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.extend([_REPO_ROOT, os.path.join(_REPO_ROOT, "agents")])
+from requirement_parser import parse_requirement
 
 # Import sample data from separate file
 from sample_data import (
@@ -233,73 +239,49 @@ def match_rfp_requirement_to_products(rfp_requirement: str) -> str:
     Match a single RFP product requirement to top 3 OEM products with spec match percentage.
     Input: RFP requirement description (e.g., '1.1 kV XLPE Power Cable - 3C x 120 sqmm')
     """
-    req_lower = rfp_requirement.lower()
+    req_specs = parse_requirement(rfp_requirement)
     matches = []
     
-    req_specs = {
-        "voltage": None,
-        "insulation": None,
-        "cores": None,
-        "size": None,
-    }
-    
-    if "1.1 kv" in req_lower or "1.1kv" in req_lower:
-        req_specs["voltage"] = "1.1 kV"
-    elif "450/750" in req_lower:
-        req_specs["voltage"] = "450/750 V"
-    
-    for ins in ["xlpe", "pvc", "fr-lsh", "rubber"]:
-        if ins in req_lower:
-            req_specs["insulation"] = ins.upper()
-    
-    core_match = re.search(r'(\d+)\s*c(?:ore)?', req_lower)
-    if core_match:
-        req_specs["cores"] = int(core_match.group(1))
-    
-    size_match = re.search(r'(\d+(?:\.\d+)?)\s*sqmm', req_lower)
-    if size_match:
-        req_specs["size"] = float(size_match.group(1))
-    
     for product in OEM_PRODUCT_CATALOG:
         score = 0
         total_criteria = 0
         match_details = []
         specs = product["specs"]
         
-        if req_specs["voltage"]:
+        if req_specs.voltage:
             total_criteria += 1
-            if specs.get("voltage_grade") == req_specs["voltage"]:
+            if specs.get("voltage_grade") == req_specs.voltage:
                 score += 1
                 match_details.append("✓ Voltage")
             else:
                 match_details.append("✗ Voltage")
         
-        if req_specs["insulation"]:
+        if req_specs.insulation:
             total_criteria += 1
-            if req_specs["insulation"].lower() in specs.get("insulation", "").lower():
+            if req_specs.insulation.lower() in specs.get("insulation", "").lower():
                 score += 1
                 match_details.append("✓ Insulation")
             else:
                 match_details.append("✗ Insulation")
         
-        if req_specs["cores"]:
+        if req_specs.cores:
             total_criteria += 1
-            if specs.get("cores") == req_specs["cores"]:
+            if specs.get("cores") == req_specs.cores:
                 score += 1
                 match_details.append("✓ Cores")
-            elif specs.get("cores") and abs(specs.get("cores") - req_specs["cores"]) <= 2:
+            elif specs.get("cores") and abs(specs.get("cores") - req_specs.cores) <= 2:
                 score += 0.5
                 match_details.append("~ Cores (close)")
             else:
                 match_details.append("✗ Cores")
         
-        if req_specs["size"]:
+        if req_specs.size:
             total_criteria += 1
             product_size = specs.get("conductor_size_sqmm", 0)
-            if product_size == req_specs["size"]:
+            if product_size == req_specs.size:
                 score += 1
                 match_details.append("✓ Size")
-            elif product_size and abs(product_size - req_specs["size"]) / req_specs["size"] <= 0.25:
+            elif product_size and abs(product_size - req_specs.size) / req_specs.size <= 0.25:
                 score += 0.5
                 match_details.append("~ Size (close)")
             else:
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Same import roots the backend and agents use: the repo root and agents/
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "agents")]
@@ -0,0 +1,37 @@
+"""
+Alternatives graph patched for catalog edits against a full rebuild of the
+edited catalog, using the products in data/catalog.json.
+"""
+import json
+import os
+
+from backend.core.catalog_fields import normalize_product
+from technical_agent.alternatives import AlternativesGraph
+
+CATALOG = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "catalog.json")
+
+
+def test_patched_graph_matches_rebuild(tmp_path):
+    with open(CATALOG) as f:
+        raw = json.load(f)
+    products = [normalize_product(product) for product in raw]
+    path = str(tmp_path / "alternatives.json")
+    graph = AlternativesGraph.load_or_build(products, path)
+
+    added = normalize_product(dict(raw[3], sku="COPY-3"))
+    repriced = normalize_product(dict(raw[5], base_price_per_meter=1))
+    graph.apply_changes([
+        (None, added),
+        (products[5], repriced),
+        (products[8], None),
+    ])
+    graph.flush()
+
+    edited = [p for i, p in enumerate(products) if i not in (5, 8)] + [repriced, added]
+    rebuilt = AlternativesGraph(edited)
+    assert graph.neighbours == rebuilt.neighbours
+    assert [alt.sku for alt, _ in graph.alternatives(products[3].sku)][0] == "COPY-3"
+
+    # The flushed file is the patched graph, reused as is on the next start
+    reloaded = AlternativesGraph.load_or_build(edited, path)
+    assert reloaded.neighbours == rebuilt.neighbours
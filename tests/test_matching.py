@@ -0,0 +1,88 @@
+"""
+Fast matching paths against the reference per-product scan, on the products
+in data/catalog.json: their own specs, specs nudged into partial credit
+(±2 cores, ±25% size) and parsed tender line items.
+"""
+import json
+import os
+from dataclasses import replace
+
+import pytest
+
+from backend.core.catalog_fields import normalize_product
+from backend.core.topk import top_k
+from requirement_parser import parse_requirement
+from technical_agent.alternatives import product_requirement
+from technical_agent.catalog_index import CatalogIndex
+from technical_agent.scoring import CORES, SIZE, score_products, tie_ranks
+
+CATALOG = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "catalog.json")
+
+REQUIREMENTS = [
+    "1.1 kV XLPE Power Cable - 3C x 120 sqmm",
+    "Control Cable 16 Core - 1.5 sqmm",
+    "Fire Retardant Cable FR-LSH 4C x 6 sqmm",
+    "11kV XLPE armoured underground power cable 3C x 300 sqmm aluminium",
+    "450/750 V PVC flexible 1C x 2.5 sqmm copper",
+    "3.5C x 185 sqmm XLPE armored",
+    "12 core control cable armour",
+    "overhead aluminium conductor",
+    "4 core",
+    "2.5 sqmm",
+    "random text",
+]
+
+
+@pytest.fixture(scope="module")
+def products():
+    with open(CATALOG) as f:
+        return [normalize_product(product) for product in json.load(f)]
+
+
+@pytest.fixture(scope="module")
+def requirements(products):
+    specs = [parse_requirement(text) for text in REQUIREMENTS]
+    for product in products:
+        spec = product_requirement(product)
+        specs.append(spec)
+        if spec.cores:
+            specs += [replace(spec, cores=spec.cores + 2), replace(spec, cores=spec.cores - 2)]
+        if spec.size:
+            specs += [replace(spec, size=spec.size * 1.25), replace(spec, size=spec.size * 0.75)]
+    return specs
+
+
+def reference_top(products, spec, limit):
+    """(SKU, match percent, hit mask, close mask) of the best rows by exhaustive scan"""
+    ranks = tie_ranks(products)
+    scored = score_products(products, range(len(products)), spec)
+    best = top_k(scored, limit, score=lambda x: x[0], tie_break=lambda x: ranks[x[1]])
+    return [(products[row].sku, percent, hit, close) for percent, row, hit, close in best]
+
+
+def test_columnar_top_matches_equal_reference_scan(products, requirements):
+    pytest.importorskip("numpy")
+    from technical_agent.scoring import ColumnarCatalog
+
+    columnar = ColumnarCatalog(products)
+    close = 0
+    for spec in requirements:
+        expected = reference_top(products, spec, 5)
+        matches = columnar.top_matches(spec, 5)
+        assert [(m.sku, m.hit_mask, m.close_mask) for m in matches] == [(sku, hit, close) for sku, _, hit, close in expected]
+        assert [m.match_percent for m in matches] == pytest.approx([percent for _, percent, _, _ in expected])
+        for m in matches:
+            close |= m.close_mask
+    # The nudged specs exercise both half-credit paths
+    assert close & CORES and close & SIZE
+
+
+def test_index_candidates_score_like_exhaustive_scan(products, requirements):
+    index = CatalogIndex(products)
+    every_row = range(len(products))
+    for spec in requirements:
+        # Standards credit is added by the matcher outside the index
+        spec = replace(spec, standards=())
+        candidates = index.candidates(spec)
+        assert candidates == sorted(set(candidates))
+        assert score_products(products, candidates, spec) == score_products(products, every_row, spec)
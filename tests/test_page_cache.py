@@ -0,0 +1,41 @@
+"""
+On-disk page cache entries: round trip, and files it must ignore.
+"""
+import json
+import os
+
+from sales_agent.page_cache import CACHE_FORMAT, CacheEntry, PageCache, content_hash
+
+URL = "http://portal.test/tenders"
+
+
+def test_entries_round_trip_through_disk(tmp_path):
+    entry = CacheEntry(URL, content_hash(b"page"), etag='"v1"', last_modified="Tue, 01 Sep 2026 10:00:00 GMT",
+                       rfps=[{"id": "RFP-1"}])
+    PageCache(str(tmp_path)).put(entry)
+
+    loaded = PageCache(str(tmp_path)).get(URL)
+    assert loaded == entry
+    assert loaded.conditional_headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Tue, 01 Sep 2026 10:00:00 GMT",
+    }
+    assert PageCache(str(tmp_path)).get("http://portal.test/other") is None
+
+
+def test_stale_or_unreadable_entries_are_ignored(tmp_path):
+    cache = PageCache(str(tmp_path))
+    cache.put(CacheEntry(URL, content_hash(b"page")))
+    [name] = os.listdir(tmp_path)
+    path = os.path.join(tmp_path, name)
+
+    with open(path) as f:
+        stored = json.load(f)
+    stored["format"] = CACHE_FORMAT + 1
+    with open(path, "w") as f:
+        json.dump(stored, f)
+    assert PageCache(str(tmp_path)).get(URL) is None
+
+    with open(path, "w") as f:
+        f.write("{not json")
+    assert PageCache(str(tmp_path)).get(URL) is None
@@ -0,0 +1,289 @@
+"""
+Portal scanner against a local stand-in portal serving the fixture pages in
+tests/fixtures/portal (plus a slow page and a missing one), with ETags and
+304 answers for the page cache.
+"""
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import sales_agent.scanner
+from sales_agent.page_cache import PageCache
+from sales_agent.scanner import PortalScanner, parse_listing
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "portal")
+CONTENT_TYPES = {".html": "text/html; charset=utf-8", ".json": "application/json"}
+
+
+def read_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), "rb") as f:
+        return f.read()
+
+
+class PortalStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.requests = 0
+        self.connections = set()
+        self.last_done = 0.0
+        # Pages carry an ETag of their body hash and this version (None: no validators)
+        self.etag_version: Optional[int] = 1
+        self.if_none_match: List[Optional[str]] = []
+        self.not_modified = 0
+
+
+@contextmanager
+def serve_portal():
+    """Base URL of a stand-in portal and its request statistics; ?delay=<seconds> slows a page down"""
+    stats = PortalStats()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with stats.lock:
+                stats.requests += 1
+                stats.active += 1
+                stats.peak = max(stats.peak, stats.active)
+                stats.connections.add(self.client_address)
+            try:
+                parts = urlsplit(self.path)
+                name = parts.path.lstrip("/")
+                if name == "slow":
+                    time.sleep(2)
+                path = os.path.join(FIXTURES, name)
+                if not name or not os.path.isfile(path):
+                    return self._send(404, b"not found", "text/plain")
+                # Long enough for requests to overlap
+                time.sleep(float(parse_qs(parts.query).get("delay", ["0.02"])[0]))
+                body = read_fixture(name)
+                etag = None
+                if stats.etag_version is not None:
+                    etag = f'"{hashlib.sha1(body).hexdigest()}-{stats.etag_version}"'
+                with stats.lock:
+                    stats.if_none_match.append(self.headers.get("If-None-Match"))
+                if etag and self.headers.get("If-None-Match") == etag:
+                    with stats.lock:
+                        stats.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self._send(200, body, CONTENT_TYPES[os.path.splitext(name)[1]], etag)
+            finally:
+                with stats.lock:
+                    stats.active -= 1
+                    stats.last_done = time.perf_counter()
+
+        def _send(self, status, body, content_type, etag=None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            if etag:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client timed out
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", stats
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def portal():
+    with serve_portal() as served:
+        yield served
+
+
+@pytest.fixture
+def other_portal():
+    with serve_portal() as served:
+        yield served
+
+
+@pytest.fixture
+def scanner():
+    scanner = PortalScanner(max_workers=8, per_host=3, timeout=0.5)
+    yield scanner
+    scanner.close()
+
+
+def test_parse_listing_html():
+    rfps = parse_listing(read_fixture("listing.html"), "http://portal.test/tenders")
+
+    assert [rfp["id"] for rfp in rfps] == ["MSEDCL-2026-114", "BESCOM-CC-077"]
+    first = rfps[0]
+    assert first["title"] == "Supply of 33 kV XLPE Power Cable"
+    assert first["client"] == "MSEDCL"
+    assert first["location"] == "Pune, Maharashtra"
+    assert first["submission_deadline"] == "2026-11-06"
+    assert first["estimated_value"] == "₹3.5 Cr"
+    assert first["url"] == "http://portal.test/notice/MSEDCL-2026-114"
+    assert rfps[1]["submission_deadline"] == "2026-12-01"
+    assert rfps[1]["url"] == "http://portal.test/tenders"
+
+
+def test_parse_listing_without_value_column():
+    [rfp] = parse_listing(read_fixture("listing_no_value.html"), "http://portal.test/")
+
+    assert rfp["id"] == "NTPC-HT-2026-09"
+    assert rfp["title"] == "HT Cable Laying Works"
+    assert rfp["submission_deadline"] == "2026-11-20"
+    assert "estimated_value" not in rfp
+
+
+def test_parse_listing_json_feed():
+    [rfp] = parse_listing(read_fixture("feed.json"), "http://portal.test/feed", "application/json")
+
+    assert rfp["id"] == "DMRC-2026-031"
+    assert rfp["source"] == "http://portal.test/feed"
+
+
+def test_scan_pools_connections_and_limits_each_host(portal, scanner):
+    base, stats = portal
+    urls = [f"{base}/listing.html?page={i}" for i in range(24)]
+
+    report = scanner.scan(urls)
+
+    assert report.errors == {}
+    assert len(report.rfps) == 48
+    assert stats.requests == 24
+    assert stats.peak <= 3
+    # Keep-alive: at most one connection per concurrent request slot
+    assert len(stats.connections) <= 3
+
+
+def test_scan_reports_failed_pages(portal, scanner):
+    base, _ = portal
+    urls = [f"{base}/listing.html", f"{base}/feed.json", f"{base}/missing", f"{base}/slow", "not-a-url"]
+
+    report = scanner.scan(urls)
+
+    assert sorted(report.errors) == sorted([f"{base}/missing", f"{base}/slow", "not-a-url"])
+    assert "404" in report.errors[f"{base}/missing"]
+    assert sorted(rfp["id"] for rfp in report.rfps) == ["BESCOM-CC-077", "DMRC-2026-031", "MSEDCL-2026-114"]
+
+
+def test_busy_host_does_not_starve_others(portal, other_portal):
+    base, busy = portal
+    other_base, other = other_portal
+    # More queued pages on the busy host than the pool has threads, listed first
+    urls = [f"{base}/listing.html?delay=0.2&page={i}" for i in range(20)]
+    urls += [f"{other_base}/listing.html?page={i}" for i in range(2)]
+    scanner = PortalScanner(max_workers=4, per_host=2, timeout=5)
+    try:
+        start = time.perf_counter()
+        report = scanner.scan(urls)
+    finally:
+        scanner.close()
+
+    assert report.errors == {}
+    assert busy.peak <= 2
+    # The other host's pages go out alongside the busy host's first batch, not after its queue drains
+    assert other.last_done - start < 0.5
+    assert busy.last_done - start > 1.5
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """URLs the scanner parsed (parse_workers=0 parses in this process)"""
+    calls = []
+
+    def counting_parse(content, base_url, content_type=""):
+        calls.append(base_url)
+        return parse_listing(content, base_url, content_type)
+
+    monkeypatch.setattr(sales_agent.scanner, "parse_listing", counting_parse)
+    return calls
+
+
+def test_rescan_sends_etag_and_skips_unchanged_page(portal, parse_calls, tmp_path):
+    base, stats = portal
+    url = f"{base}/listing.html"
+    scanner = PortalScanner(timeout=5, cache=PageCache(str(tmp_path)))
+    try:
+        first = scanner.scan([url])
+        second = scanner.scan([url])
+    finally:
+        scanner.close()
+
+    assert len(first.rfps) == 2 and first.unchanged == 0
+    assert stats.if_none_match[0] is None
+    assert stats.if_none_match[1] == f'"{hashlib.sha1(read_fixture("listing.html")).hexdigest()}-1"'
+    assert stats.not_modified == 1
+    assert parse_calls == [url]
+    # Unchanged, and its RFPs were already handed out by this scanner
+    assert second.unchanged == 1 and second.rfps == [] and second.errors == {}
+
+
+def test_cache_reloaded_from_disk_returns_cached_rfps(portal, parse_calls, tmp_path):
+    base, stats = portal
+    url = f"{base}/listing.html"
+    for _ in range(2):
+        # A fresh scanner and cache each time, as after a restart
+        scanner = PortalScanner(timeout=5, cache=PageCache(str(tmp_path)))
+        try:
+            report = scanner.scan([url])
+        finally:
+            scanner.close()
+
+    assert stats.not_modified == 1
+    assert parse_calls == [url]
+    assert report.unchanged == 1
+    assert [rfp["id"] for rfp in report.rfps] == ["MSEDCL-2026-114", "BESCOM-CC-077"]
+
+
+def test_same_body_without_validators_is_not_parsed_again(portal, parse_calls, tmp_path):
+    base, stats = portal
+    stats.etag_version = None
+    url = f"{base}/feed.json"
+    scanner = PortalScanner(timeout=5, cache=PageCache(str(tmp_path)))
+    try:
+        scanner.scan([url])
+        report = scanner.scan([url])
+    finally:
+        scanner.close()
+
+    assert stats.if_none_match == [None, None]
+    assert stats.not_modified == 0
+    assert parse_calls == [url]
+    assert report.unchanged == 1
+
+
+def test_changed_validators_are_refreshed(portal, parse_calls, tmp_path):
+    base, stats = portal
+    url = f"{base}/listing.html"
+    cache = PageCache(str(tmp_path))
+    scanner = PortalScanner(timeout=5, cache=cache)
+    try:
+        scanner.scan([url])
+        # Same body under a new ETag: a full 200, recognised by its hash, and the new ETag is kept
+        stats.etag_version = 2
+        refreshed = scanner.scan([url])
+        again = scanner.scan([url])
+    finally:
+        scanner.close()
+
+    etag = f'"{hashlib.sha1(read_fixture("listing.html")).hexdigest()}-2"'
+    assert refreshed.unchanged == 1 and again.unchanged == 1
+    assert stats.not_modified == 1 and stats.if_none_match[-1] == etag
+    assert parse_calls == [url]
+    assert PageCache(str(tmp_path)).get(url).etag == etag
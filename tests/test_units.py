@@ -0,0 +1,31 @@
+"""
+Tender quantity parsing into metres.
+"""
+import pytest
+
+from backend.core.units import parse_quantity_m
+
+
+@pytest.mark.parametrize("text, metres", [
+    ("5,000 m", 5000),
+    ("5 km", 5000),
+    ("2.5 kms", 2500),
+    ("8000 meters", 8000),
+    ("5000", 5000),
+    ("2 drums of 500 m", 1000),
+    ("3 coils x 1000 m", 3000),
+    ("6 drums (each 1000 m)", 6000),
+    ("6 drums, each 1000 m", 6000),
+    ("3 x 500 m", 1500),
+    ("4 runs x 250 m", 1000),
+    ("4 lengths of 250m", 1000),
+    ("4 nos. x 250 m", 1000),
+    ("500 m x 4 runs", 2000),
+])
+def test_parse_quantity_m(text, metres):
+    assert parse_quantity_m(text) == metres
+
+
+@pytest.mark.parametrize("text", ["10 Nos", "1 lot", "120 sqmm", "", None])
+def test_parse_quantity_m_without_a_length(text):
+    assert parse_quantity_m(text) is None